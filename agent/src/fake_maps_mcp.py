@@ -0,0 +1,121 @@
+"""
+Fake Google Maps MCP server used by the load-test driver.
+
+Exposes the same tool names as the official `mcp/google-maps` image but
+answers from a deterministic in-memory catalogue, so load tests exercise
+the real stdio MCP round-trip without touching Google.
+"""
+
+import asyncio
+import json
+import os
+import random
+from typing import List, Optional
+
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("fake-google-maps", log_level="WARNING")
+
+# Optional artificial upstream latency, in milliseconds
+LATENCY_MS = float(os.getenv("FAKE_MAPS_LATENCY_MS", "0"))
+
+CUISINES = ["Japanese", "Italian", "Peruvian", "Mexican", "Parrilla", "Vegan", "Pizza", "Sushi"]
+NEIGHBOURHOODS = ["Palermo", "Belgrano", "Recoleta", "San Telmo", "Villa Crespo", "Colegiales"]
+
+_rng = random.Random(42)
+PLACES = {}
+for i in range(200):
+    cuisine = CUISINES[i % len(CUISINES)]
+    hood = NEIGHBOURHOODS[i % len(NEIGHBOURHOODS)]
+    place_id = f"fake_place_{i:04d}"
+    PLACES[place_id] = {
+        "place_id": place_id,
+        "name": f"{cuisine} House {i} ({hood})",
+        "formatted_address": f"Calle {i} 123, {hood}, Buenos Aires",
+        "location": {
+            "lat": -34.58 + _rng.uniform(-0.04, 0.04),
+            "lng": -58.43 + _rng.uniform(-0.04, 0.04),
+        },
+        "rating": round(_rng.uniform(3.0, 5.0), 1),
+        "user_ratings_total": _rng.randint(5, 3000),
+        "price_level": _rng.randint(1, 4),
+        "types": ["restaurant", "food"],
+        "cuisine": cuisine,
+        "neighbourhood": hood,
+    }
+
+
+async def _simulate_latency():
+    # Tools are async so concurrent calls overlap; FastMCP runs sync tools
+    # on its event loop one at a time
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000.0)
+
+
+@mcp.tool()
+async def maps_geocode(address: str) -> str:
+    """Convert an address into geographic coordinates"""
+    await _simulate_latency()
+    return json.dumps({
+        "location": {"lat": -34.58, "lng": -58.43},
+        "formatted_address": address,
+        "place_id": "fake_geocode",
+    })
+
+
+@mcp.tool()
+async def maps_search_places(query: str, radius: Optional[float] = None) -> str:
+    """Search for places using Google Places API"""
+    await _simulate_latency()
+    terms = query.lower().split()
+    matches = [
+        p for p in PLACES.values()
+        if any(t in p["cuisine"].lower() or t in p["neighbourhood"].lower() for t in terms)
+    ] or list(PLACES.values())
+    places = [
+        {k: p[k] for k in ("place_id", "name", "formatted_address", "location", "rating", "types")}
+        for p in matches[:20]
+    ]
+    return json.dumps({"places": places})
+
+
+@mcp.tool()
+async def maps_place_details(place_id: str) -> str:
+    """Get detailed information about a specific place"""
+    await _simulate_latency()
+    place = PLACES.get(place_id)
+    if place is None:
+        return json.dumps({"error": f"Place not found: {place_id}"})
+    details = dict(place)
+    details["formatted_phone_number"] = "011 4000-0000"
+    details["website"] = f"https://example.com/{place_id}"
+    details["reviews"] = [
+        {"author_name": "Tester", "rating": 5, "text": "Great food, friendly staff. " * 5},
+        {"author_name": "Load", "rating": 4, "text": "Would come back for the dessert. " * 5},
+    ]
+    details["opening_hours"] = {
+        "open_now": True,
+        "weekday_text": [f"{d}: 12:00 PM – 11:30 PM" for d in
+                         ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")],
+    }
+    return json.dumps(details)
+
+
+@mcp.tool()
+async def maps_distance_matrix(origins: List[str], destinations: List[str], mode: str = "walking") -> str:
+    """Calculate travel distance and time for multiple origins and destinations"""
+    await _simulate_latency()
+    rows = [
+        {"elements": [
+            {"status": "OK",
+             "distance": {"text": "1.2 km", "value": 1200},
+             "duration": {"text": "15 mins", "value": 900}}
+            for _ in destinations
+        ]}
+        for _ in origins
+    ]
+    return json.dumps({"origin_addresses": origins, "destination_addresses": destinations, "results": rows})
+
+
+if __name__ == "__main__":
+    mcp.run()
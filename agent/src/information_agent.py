@@ -40,4 +40,6 @@ Encourage completion without pressuring the user.
     deps_type=str,
     retries=1,
     instrument=True,
+    # Resolve the Gemini provider on first run rather than at import
+    defer_model_check=True,
 )
\ No newline at end of file
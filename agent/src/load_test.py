@@ -0,0 +1,295 @@
+"""
+Load-test driver for the agent server.
+
+Simulates many concurrent multi-turn conversations against
+`/prompt/{session_id}` and `/prompt_response/{session_id}` with the Gemini
+models replaced by pydantic-ai `FunctionModel`s and the Google Maps MCP
+server replaced by `fake_maps_mcp.py`. For each concurrency level it reports
+p50/p95/p99 latency, throughput and per-session history growth.
+
+Usage:
+    poetry run python load_test.py --concurrency 1,10,50,200 --turns 4
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import resource
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import httpx
+from pydantic_ai.mcp import MCPServerStdio
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+    ToolReturnPart,
+    UserPromptPart,
+)
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+import server
+from information_agent import agent
+from recommender_agent import agent2
+
+FAKE_MCP_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_maps_mcp.py")
+
+CONVERSATION = [
+    "Hi! I'm hungry, can you help me find somewhere to eat?",
+    "I'm in Palermo Soho, near Plaza Serrano.",
+    "Something Japanese or sushi, moderately priced, around $20-$30 per person.",
+    "Walking distance please, and only places rated 4 stars or more.",
+    "Casual atmosphere is fine, I don't want to wait more than 15 minutes.",
+    "No other preferences, that's all.",
+]
+
+INFORMATION_REPLIES = [
+    "Of course! Where are you right now?",
+    "Great spot. What kind of food are you in the mood for?",
+    "Nice choice. How far are you willing to go?",
+    "Got it. Any preference on atmosphere or waiting time?",
+    "Perfect. Please click on the Next button to see my suggestions.",
+]
+
+
+def make_information_model(latency_s: float) -> FunctionModel:
+    """Stand-in for the information agent's Gemini model."""
+
+    async def reply(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if latency_s:
+            await asyncio.sleep(latency_s)
+        turn = sum(1 for m in messages if isinstance(m, ModelRequest)) - 1
+        text = INFORMATION_REPLIES[min(turn, len(INFORMATION_REPLIES) - 1)]
+        return ModelResponse(parts=[TextPart(text)])
+
+    return FunctionModel(reply)
+
+
+def _tool_payload(content) -> Dict:
+    """Decode the JSON body of an MCP tool result."""
+    if hasattr(content, "content"):
+        content = "".join(getattr(item, "text", "") for item in content.content)
+    if isinstance(content, str):
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            return {}
+    return content if isinstance(content, dict) else {}
+
+
+def _last_user_prompt(messages: List[ModelMessage]) -> str:
+    for message in reversed(messages):
+        if isinstance(message, ModelRequest):
+            for part in message.parts:
+                if isinstance(part, UserPromptPart) and isinstance(part.content, str):
+                    return part.content
+    return "restaurant"
+
+
+def make_recommender_model(latency_s: float, details_per_search: int) -> FunctionModel:
+    """
+    Stand-in for the recommender agent's Gemini model.
+
+    Follows the same tool sequence the real prompt asks for: one
+    `maps_search_places` call, a batch of `maps_place_details` calls and
+    finally the structured result tool.
+    """
+
+    async def recommend(messages: List[ModelMessage], info: AgentInfo) -> ModelResponse:
+        if latency_s:
+            await asyncio.sleep(latency_s)
+
+        last = messages[-1]
+        returns = [p for p in last.parts if isinstance(p, ToolReturnPart)] if isinstance(last, ModelRequest) else []
+
+        if not returns:
+            return ModelResponse(parts=[
+                ToolCallPart("maps_search_places", {"query": _last_user_prompt(messages)})
+            ])
+
+        if returns[0].tool_name == "maps_search_places":
+            places = _tool_payload(returns[0].content).get("places", [])[:details_per_search]
+            if places:
+                return ModelResponse(parts=[
+                    ToolCallPart("maps_place_details", {"place_id": p["place_id"]}) for p in places
+                ])
+
+        restaurants = []
+        for part in returns:
+            details = _tool_payload(part.content)
+            if "place_id" in details:
+                restaurants.append({
+                    "name": details.get("name", "Unknown"),
+                    "place_id": details["place_id"],
+                    "why_is_a_good_choice_for_you": f"Rated {details.get('rating')} and close to you.",
+                })
+        return ModelResponse(parts=[ToolCallPart(info.result_tools[0].name, {"restaurants": restaurants})])
+
+    return FunctionModel(recommend)
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    latency: float
+    ok: bool
+
+
+@dataclass
+class LevelReport:
+    concurrency: int
+    requests: int = 0
+    errors: int = 0
+    elapsed: float = 0.0
+    latency_ms: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    throughput: float = 0.0
+    history_messages_per_turn: List[float] = field(default_factory=list)
+    history_kb_mean: float = 0.0
+    history_kb_max: float = 0.0
+    rss_delta_mb: float = 0.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process, falling back to the peak value."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _timed(samples: List[Sample], endpoint: str, request) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await request
+        ok = response.status_code == 200
+    except Exception:
+        response, ok = None, False
+    samples.append(Sample(endpoint, time.perf_counter() - start, ok))
+    return response
+
+
+async def run_session(client: httpx.AsyncClient, turns: int, samples: List[Sample],
+                      growth: List[List[int]]) -> str:
+    """Drive one conversation: `turns` prompts followed by the recommendation."""
+    session_id = uuid.uuid4().hex
+    sizes = []
+    for message in CONVERSATION[:turns]:
+        await _timed(samples, "prompt", client.post(f"/prompt/{session_id}", json={"message": message}))
+        sizes.append(len(server.sessions.get(session_id) or []))
+    await _timed(samples, "prompt_response", client.post(f"/prompt_response/{session_id}"))
+    sizes.append(len(server.sessions.get(session_id) or []))
+    growth.append(sizes)
+    return session_id
+
+
+async def run_level(client: httpx.AsyncClient, concurrency: int, turns: int) -> LevelReport:
+    server.sessions.clear()
+    gc.collect()
+    rss_before = current_rss_mb()
+
+    samples: List[Sample] = []
+    growth: List[List[int]] = []
+    start = time.perf_counter()
+    session_ids = await asyncio.gather(*(run_session(client, turns, samples, growth) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    report = LevelReport(concurrency=concurrency, elapsed=elapsed)
+    report.requests = len(samples)
+    report.errors = sum(1 for s in samples if not s.ok)
+    report.throughput = report.requests / elapsed if elapsed else 0.0
+    for endpoint in ("all", "prompt", "prompt_response"):
+        latencies = [s.latency * 1000 for s in samples if endpoint == "all" or s.endpoint == endpoint]
+        report.latency_ms[endpoint] = {
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+        }
+
+    steps = max((len(g) for g in growth), default=0)
+    report.history_messages_per_turn = [
+        sum(g[i] for g in growth if len(g) > i) / max(1, sum(1 for g in growth if len(g) > i))
+        for i in range(steps)
+    ]
+    raw_histories = [server.sessions.get_raw(sid) for sid in session_ids]
+    sizes_kb = [len(raw) / 1024 for raw in raw_histories if raw is not None]
+    if sizes_kb:
+        report.history_kb_mean = sum(sizes_kb) / len(sizes_kb)
+        report.history_kb_max = max(sizes_kb)
+    report.rss_delta_mb = current_rss_mb() - rss_before
+    return report
+
+
+def print_report(report: LevelReport):
+    lat = report.latency_ms
+    print(
+        f"{report.concurrency:>6} {report.requests:>7} {report.errors:>6} {report.throughput:>9.1f}"
+        f" {lat['all']['p50']:>8.1f} {lat['all']['p95']:>8.1f} {lat['all']['p99']:>8.1f}"
+        f" {lat['prompt_response']['p99']:>10.1f}"
+        f" {report.history_kb_mean:>9.1f} {report.history_kb_max:>9.1f} {report.rss_delta_mb:>8.1f}"
+    )
+    growth = " -> ".join(f"{n:.0f}" for n in report.history_messages_per_turn)
+    print(f"{'':>6} history messages per turn: {growth}")
+
+
+async def main(args):
+    # Swap the real Google Maps MCP container for the local fake
+    agent2._mcp_servers = [MCPServerStdio(
+        sys.executable,
+        args=[FAKE_MCP_SCRIPT],
+        env={**os.environ, "FAKE_MAPS_LATENCY_MS": str(args.maps_latency_ms)},
+    )]
+
+    model_latency = args.model_latency_ms / 1000.0
+    reports = []
+    with agent.override(model=make_information_model(model_latency)), \
+            agent2.override(model=make_recommender_model(model_latency, args.details)):
+        async with server.lifespan(server.app):
+            transport = httpx.ASGITransport(app=server.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+                print(f"{'conc':>6} {'reqs':>7} {'errors':>6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}"
+                      f" {'p99 ms':>8} {'p99 rec':>10} {'hist KB':>9} {'max KB':>9} {'RSS +MB':>8}")
+                for concurrency in args.concurrency:
+                    report = await run_level(client, concurrency, args.turns)
+                    print_report(report)
+                    reports.append(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([r.__dict__ for r in reports], f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the agent server with fake models and a fake MCP server")
+    parser.add_argument("--concurrency", default="1,10,50,100",
+                        type=lambda s: [int(c) for c in s.split(",") if c],
+                        help="comma-separated concurrent session counts to test")
+    parser.add_argument("--turns", type=int, default=4,
+                        help=f"user prompts per session before asking for a recommendation (max {len(CONVERSATION)})")
+    parser.add_argument("--details", type=int, default=3, help="place details fetched per recommendation")
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="simulated LLM latency per model call")
+    parser.add_argument("--maps-latency-ms", type=float, default=0.0, help="simulated Google Maps latency per tool call")
+    parser.add_argument("--json", help="write the per-level reports to this file")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(parse_args()))
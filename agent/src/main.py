@@ -1,18 +1,18 @@
-from enum import Enum
-from pydantic import BaseModel
-from pydantic_ai import Agent
-from pydantic_ai.mcp import MCPServerStdio
-import logfire
 import asyncio
 from dotenv import load_dotenv
 
-from information_agent import agent
 from recommender_agent import agent2
 
 load_dotenv()
 
-logfire.configure()
-logfire.instrument_httpx(capture_all=True)
+
+def configure_logfire():
+    # logfire pulls in the OpenTelemetry SDK, so only import it when it's used
+    import logfire
+
+    logfire.configure()
+    logfire.instrument_httpx(capture_all=True)
+
 
 async def main():
     try:
@@ -29,4 +29,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    configure_logfire()
     asyncio.run(main())
@@ -1,16 +1,13 @@
-from enum import Enum
-from pydantic import BaseModel, HttpUrl, Field
+from pydantic import BaseModel
 from pydantic_ai import Agent
 from pydantic_ai.mcp import MCPServerStdio
-import logfire
-import asyncio
 from dotenv import load_dotenv
-from typing import List, Optional
-from datetime import datetime
+from typing import List
 import os
 
 load_dotenv()
 
+# Only describes the container; it is started by agent2.run_mcp_servers()
 server = MCPServerStdio(
     "docker",
     args=[
@@ -146,4 +143,6 @@ Remember: Your responses must be based SOLELY on real data retrieved through the
     retries=1,
     instrument=True,
     mcp_servers=[server],
+    # Resolve the Gemini provider on first run rather than at import
+    defer_model_check=True,
 )
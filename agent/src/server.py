@@ -1,19 +1,37 @@
+import os
 from contextlib import asynccontextmanager
+from typing import Optional
 from pydantic import BaseModel
 from pydantic_ai.usage import UsageLimits
 
 
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from information_agent import agent
 from recommender_agent import agent2
+from session_store import SessionStore
+
+
+# session_id => message history, shared by all workers when SESSION_DB_PATH is
+# set; opened in the lifespan so importing this module has no side effects
+sessions: Optional[SessionStore] = None
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global sessions
     print("Starting up...")
-    async with agent2.run_mcp_servers():
-        yield  # FastAPI runs here
+    sessions = SessionStore(
+        os.getenv("SESSION_DB_PATH"),
+        ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", str(24 * 3600))),
+    )
+    try:
+        sessions.purge_expired()
+        async with agent2.run_mcp_servers():
+            yield  # FastAPI runs here
+    finally:
+        sessions.close()
 
 
 app = FastAPI(lifespan=lifespan)
@@ -35,39 +53,48 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-sessions = {}  # session_id => context
-
-
 class UserPrompt(BaseModel):
     message: str
 
 
 @app.get("/sessions")
 def active_sessions():
-    return list(sessions.keys())
+    return sessions.keys()
+
+
+async def _save_turn(session_id: str, version: int, response) -> None:
+    """
+    Store the history with the turn a run added.
+
+    If an overlapping request saved the session after `version` was read,
+    the turn is added to the history it saved instead of overwriting it.
+    """
+    # all_messages() already includes the history passed in
+    messages = response.all_messages()
+    while not await run_in_threadpool(sessions.save, session_id, messages, version):
+        history, version = await run_in_threadpool(sessions.get_versioned, session_id)
+        messages = (history or []) + response.new_messages()
 
 
 @app.post("/prompt/{session_id}")
 async def post_prompt(session_id: str, prompt: UserPrompt):
-    if session_id not in sessions:
-        sessions[session_id] = {"history": []}
+    # SQLite I/O and (de)serializing the history grow with the conversation,
+    # so keep them off the event loop
+    history, version = await run_in_threadpool(sessions.get_versioned, session_id)
 
-    history = sessions[session_id]["history"]
+    response = await agent.run(prompt.message, message_history=history or [])
 
-    response = await agent.run(prompt.message, message_history=history)
-
-    history.extend(response.all_messages())
+    await _save_turn(session_id, version, response)
     return response.data
 
 
 @app.post("/prompt_response/{session_id}")
 async def post_prompt_response(session_id: str):
-    if session_id not in sessions:
+    history, version = await run_in_threadpool(sessions.get_versioned, session_id)
+    if history is None:
         return []
 
-    history = sessions[session_id]["history"]
-
     response = await agent2.run(None, message_history=history)
 
-    history.extend(response.all_messages())
+    await _save_turn(session_id, version, response)
     return response.data
@@ -0,0 +1,133 @@
+"""
+Conversation history storage shared by all server workers.
+
+Histories are stored as pydantic-ai message JSON in SQLite (WAL mode), so
+any worker process can continue any session. Without a path the database
+lives in memory and is private to the process.
+
+Every save bumps the session's version. Requests that read a history, run
+the agent and write it back pass the version they read, so a request that
+overlapped with another one finds out instead of overwriting its turn.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from pydantic_ai.messages import ModelMessage, ModelMessagesTypeAdapter
+
+
+class SessionStore:
+    def __init__(self, path: Optional[str] = None, ttl_seconds: float = 24 * 3600):
+        self.path = path or ":memory:"
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        if path:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " history BLOB NOT NULL,"
+            " updated_at REAL NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sessions)")]
+        if "version" not in columns:
+            # Databases created before sessions were versioned
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get_raw(session_id) is not None
+
+    def get_raw(self, session_id: str) -> Optional[bytes]:
+        """Serialized history of a session, or None if it doesn't exist."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT history FROM sessions WHERE session_id = ? AND updated_at > ?",
+                (session_id, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def get(self, session_id: str) -> Optional[List[ModelMessage]]:
+        """Message history of a session, or None if it doesn't exist."""
+        raw = self.get_raw(session_id)
+        return None if raw is None else ModelMessagesTypeAdapter.validate_json(raw)
+
+    def get_versioned(self, session_id: str) -> Tuple[Optional[List[ModelMessage]], int]:
+        """
+        Message history of a session (None if it doesn't exist) and its version.
+
+        The version is 0 for sessions that were never saved; an expired
+        session keeps its version so saving it again replaces it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT history, updated_at, version FROM sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+        if row is None:
+            return None, 0
+        raw, updated_at, version = row
+        if updated_at <= time.time() - self.ttl_seconds:
+            return None, version
+        return ModelMessagesTypeAdapter.validate_json(raw), version
+
+    def save(self, session_id: str, history: List[ModelMessage], expected_version: Optional[int] = None) -> bool:
+        """
+        Replace the stored history of a session.
+
+        With `expected_version` (from get_versioned) the history is only
+        stored if the session hasn't been saved since that version was read.
+
+        Returns:
+            Whether the history was stored
+        """
+        raw = ModelMessagesTypeAdapter.dump_json(history)
+        now = time.time()
+        with self._lock:
+            if expected_version is None:
+                cursor = self._conn.execute(
+                    "INSERT INTO sessions (session_id, history, updated_at, version) VALUES (?, ?, ?, 1)"
+                    " ON CONFLICT (session_id) DO UPDATE SET"
+                    " history = excluded.history, updated_at = excluded.updated_at, version = version + 1",
+                    (session_id, raw, now),
+                )
+            elif expected_version == 0:
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO sessions (session_id, history, updated_at, version) VALUES (?, ?, ?, 1)",
+                    (session_id, raw, now),
+                )
+            else:
+                cursor = self._conn.execute(
+                    "UPDATE sessions SET history = ?, updated_at = ?, version = version + 1"
+                    " WHERE session_id = ? AND version = ?",
+                    (raw, now, session_id, expected_version),
+                )
+        return cursor.rowcount == 1
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT session_id FROM sessions WHERE updated_at > ?",
+                (time.time() - self.ttl_seconds,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM sessions WHERE updated_at <= ?",
+                (time.time() - self.ttl_seconds,),
+            )
+        return cursor.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,118 @@
+"""Tests for the shared session store and how overlapping turns are saved."""
+
+import asyncio
+import sqlite3
+
+import pytest
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+import server
+import session_store
+from session_store import SessionStore
+
+
+def turn(prompt):
+    return [ModelRequest(parts=[UserPromptPart(content=prompt)]), ModelResponse(parts=[TextPart(content=f"re: {prompt}")])]
+
+
+def prompts(history):
+    return [message.parts[0].content for message in history if isinstance(message, ModelRequest)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class FakeRunResult:
+    """The parts of a pydantic-ai run result the server saves."""
+
+    def __init__(self, history, new):
+        self.history, self.new = history, new
+
+    def all_messages(self):
+        return self.history + self.new
+
+    def new_messages(self):
+        return self.new
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.sqlite"))
+    yield store
+    store.close()
+
+
+def test_histories_round_trip(store):
+    assert store.get("s1") is None
+    assert "s1" not in store
+    store.save("s1", turn("hola"))
+    assert prompts(store.get("s1")) == ["hola"]
+    assert "s1" in store and store.keys() == ["s1"]
+
+
+def test_saves_with_a_stale_version_are_rejected(store):
+    assert store.get_versioned("s1") == (None, 0)
+    assert store.save("s1", turn("first"), expected_version=0)
+    assert not store.save("s1", turn("overlapping"), expected_version=0)
+    history, version = store.get_versioned("s1")
+    assert (prompts(history), version) == (["first"], 1)
+    assert store.save("s1", history + turn("second"), expected_version=1)
+    assert not store.save("s1", turn("stale"), expected_version=1)
+    assert prompts(store.get("s1")) == ["first", "second"]
+    # Unconditional saves still bump the version
+    store.save("s1", turn("reset"))
+    assert store.get_versioned("s1")[1] == 3
+
+
+def test_workers_sharing_the_database_see_each_others_saves(store):
+    other = SessionStore(store.path)
+    try:
+        store.save("s1", turn("first"))
+        history, version = other.get_versioned("s1")
+        assert store.save("s1", history + turn("from store"), expected_version=version)
+        assert not other.save("s1", history + turn("from other"), expected_version=version)
+    finally:
+        other.close()
+
+
+def test_expired_sessions_are_gone_but_keep_their_version(store, monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+    store.ttl_seconds = 60
+    store.save("s1", turn("old"))
+    clock.now += 61
+    assert store.get("s1") is None
+    assert store.get_versioned("s1") == (None, 1)
+    assert store.save("s1", turn("new"), expected_version=1)
+    assert prompts(store.get("s1")) == ["new"]
+    clock.now += 61
+    assert store.purge_expired() == 1
+    assert store.keys() == []
+
+
+def test_databases_without_versions_are_upgraded(tmp_path):
+    path = str(tmp_path / "sessions.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sessions (session_id TEXT PRIMARY KEY, history BLOB NOT NULL, updated_at REAL NOT NULL)")
+    conn.close()
+    store = SessionStore(path)
+    try:
+        assert store.save("s1", turn("hola"), expected_version=0)
+        assert store.get_versioned("s1")[1] == 1
+    finally:
+        store.close()
+
+
+def test_overlapping_turns_are_both_kept(store, monkeypatch):
+    monkeypatch.setattr(server, "sessions", store)
+    store.save("s1", turn("first"))
+    history, version = store.get_versioned("s1")
+    # Two requests ran on the same history; the second to finish must not drop the first's turn
+    asyncio.run(server._save_turn("s1", version, FakeRunResult(history, turn("sushi?"))))
+    asyncio.run(server._save_turn("s1", version, FakeRunResult(history, turn("pizza?"))))
+    assert prompts(store.get("s1")) == ["first", "sushi?", "pizza?"]
@@ -0,0 +1,44 @@
+"""
+Fast JSON responses for the backend API.
+Created: 2025-04-16
+Changes:
+- Initial implementation of RecordJSONResponse with optional orjson encoding
+- orjson is a declared dependency; the standard library path is only a fallback
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from google_maps_agent.records import RestaurantRecord
+
+try:
+    import orjson
+except ImportError:  # orjson is a dependency, but keep working in environments without it
+    orjson = None
+
+
+def _encode_default(obj: Any) -> Any:
+    """Serialize types the JSON encoders don't know about."""
+    if isinstance(obj, RestaurantRecord):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class RecordJSONResponse(JSONResponse):
+    """
+    JSON response that encodes RestaurantRecord objects directly.
+
+    Returning an instance from an endpoint bypasses FastAPI's
+    `jsonable_encoder` pass, so content is encoded exactly once, with orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_encode_default)
+        return json.dumps(
+            content,
+            default=_encode_default,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
@@ -9,18 +9,56 @@ Changes:
 - Fixed import statement
 - Updated to use correct RestaurantFinderAgent class
 - Updated to use OpenAI client with Kluster's LLaMA
+- Search and details endpoints run in the threadpool so concurrent place
+  details lookups can be coalesced by the agent
+- Restaurants stay RestaurantRecord objects until serialized in the endpoints
+- Search and details responses are encoded once by RecordJSONResponse, with
+  optional gzip compression of large responses
+- analyze_with_llama sends a compact, pre-ranked top-K table within a token budget
+- Added optional semantic cache of optimized queries and search results
+- Added local rule-based query optimizer with LLaMA fallback (QUERY_OPTIMIZER=local)
+- Added a per-request deadline: stages that run short of time are skipped or
+  degraded, and LLaMA calls get timeouts
+- Added lifespan warm-up and graceful shutdown for multi-worker serving
+- Faster cold start: the agent is built in the lifespan, and the OpenAI client
+  and semantic cache are built on first use or by a background warm-up
+- Searches can give the user's location, travel mode and distance limits;
+  results get travel times and are filtered and ranked by them
+- Searches can set the strategy filters (radius, keyword, open_now,
+  min_rating, max_price), which the agent now applies
+- Searches can ask for places open at a given time (open_at), which the
+  recommendations are also written for
+- The search deadline starts once the semantic cache is loaded, and falling
+  back to heuristic recommendations after a LLaMA error is reported as degraded
+- Results are returned in rank_candidates order, so travel time counts in
+  the ranking the client shows as well as in the recommendations
+- Semantic cache hits need the same neighbourhood as the query
+- Place details answer 502 when the Places API fails and 504 when it's too
+  slow, instead of 404
 """
 
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from contextlib import asynccontextmanager
+from datetime import datetime
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
-from google_maps_agent.agent import RestaurantFinderAgent
+from typing import Optional, List, Dict, Any, Literal, Tuple, TYPE_CHECKING
+from google_maps_agent.agent import PlacesAPIError, RestaurantFinderAgent
+from google_maps_agent.deadline import Deadline
+from google_maps_agent.records import RestaurantRecord
+from api_responses import RecordJSONResponse
+from prompt_encoder import encode_restaurants, open_statuses, rank_candidates
+from semantic_cache import DEFAULT_MODEL, create_semantic_cache
+from query_rewriter import rewrite_query
 import os
 import logging
-import json
+import threading
 from dotenv import load_dotenv
-from openai import OpenAI
+
+if TYPE_CHECKING:
+    from openai import OpenAI
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,13 +67,88 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client with Kluster configuration
-client = OpenAI(
-    api_key=os.getenv('KLUSTER_AI_API_KEY'),
-    base_url="https://api.kluster.ai/v1"
-)
+# Clients are built on first use (see get_agent, get_llm_client and
+# get_semantic_cache) so importing this module stays cheap
+agent: Optional[RestaurantFinderAgent] = None
+client: Optional["OpenAI"] = None
+semantic_cache = None
+_semantic_cache_loaded = False
+_agent_lock = threading.Lock()
+_client_lock = threading.Lock()
+_semantic_cache_lock = threading.Lock()
+
+def get_agent() -> RestaurantFinderAgent:
+    """The Google Maps agent, created on first use."""
+    global agent
+    if agent is None:
+        with _agent_lock:
+            if agent is None:
+                agent = RestaurantFinderAgent()
+    return agent
+
+def get_llm_client() -> "OpenAI":
+    """The Kluster client, created on first use; importing openai takes most of a second."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from openai import OpenAI
+                client = OpenAI(
+                    api_key=os.getenv('KLUSTER_AI_API_KEY'),
+                    base_url="https://api.kluster.ai/v1"
+                )
+    return client
+
+def get_semantic_cache():
+    """
+    The semantic cache, or None when it is disabled or failed to load.
+
+    Similar queries in the same neighbourhood reuse the optimized query and
+    search results. The embedding model (and with it transformers and torch)
+    is only loaded when enabled.
+    """
+    global semantic_cache, _semantic_cache_loaded
+    if not _semantic_cache_loaded:
+        with _semantic_cache_lock:
+            if not _semantic_cache_loaded:
+                if SEMANTIC_CACHE_ENABLED:
+                    semantic_cache = create_semantic_cache(
+                        model_name=os.getenv("SEMANTIC_CACHE_MODEL", DEFAULT_MODEL),
+                        threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+                        max_entries=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024")),
+                        ttl_seconds=float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+                        scope=lambda query: rewrite_query(query).neighbourhood,
+                    )
+                _semantic_cache_loaded = True
+    return semantic_cache
+
+def _warm_up():
+    """Build the slow clients in the background; requests that need them first wait."""
+    try:
+        get_llm_client()
+        cache = get_semantic_cache()
+        if cache:
+            cache.embed("warm up")
+        logger.info(f"Worker {os.getpid()} warmed up")
+    except Exception as e:
+        logger.error(f"Warm-up failed: {str(e)}")
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the agent before this worker starts accepting requests, so a
+    # missing API key still fails at startup
+    finder = get_agent()
+    if finder.details_cache:
+        finder.details_cache.purge_expired()
+    if WARM_UP:
+        threading.Thread(target=_warm_up, name="warm-up", daemon=True).start()
+    logger.info(f"Worker {os.getpid()} ready")
+    yield
+    # Uvicorn has stopped accepting requests and drained in-flight ones
+    logger.info(f"Worker {os.getpid()} shutting down")
+    finder.close()
+
+app = FastAPI(default_response_class=RecordJSONResponse, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -46,11 +159,58 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
-# Initialize the agent
-agent = RestaurantFinderAgent()
+# Optionally gzip large responses, e.g. RESPONSE_GZIP_MIN_SIZE=1024
+gzip_min_size = int(os.getenv("RESPONSE_GZIP_MIN_SIZE", "0"))
+if gzip_min_size > 0:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=gzip_min_size,
+        compresslevel=int(os.getenv("RESPONSE_GZIP_LEVEL", "5")),
+    )
+
+# Query optimizer: "remote" always asks LLaMA, "local" uses the rule-based
+# rewriter and only asks LLaMA when its confidence is too low
+QUERY_OPTIMIZER = os.getenv("QUERY_OPTIMIZER", "remote").lower()
+QUERY_OPTIMIZER_MIN_CONFIDENCE = float(os.getenv("QUERY_OPTIMIZER_MIN_CONFIDENCE", "0.8"))
+
+# Time budget for a whole search request (0 disables it) and cap for the optimize stage
+SEARCH_DEADLINE_SECONDS = float(os.getenv("SEARCH_DEADLINE_SECONDS", "10"))
+OPTIMIZE_TIMEOUT_SECONDS = float(os.getenv("OPTIMIZE_TIMEOUT_SECONDS", "3"))
+
+# Minimum time worth starting each stage with
+MIN_OPTIMIZE_SECONDS = 0.5
+MIN_SEARCH_SECONDS = 2.0
+MIN_ANALYZE_SECONDS = 1.5
+
+# Optional semantic cache, see get_semantic_cache
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+
+# Build the LLM client and semantic cache in the background after startup
+WARM_UP = os.getenv("STARTUP_WARM_UP", "true").lower() == "true"
 
 class SearchRequest(BaseModel):
     query: str
+    # Where the user is (address or "lat,lng") and how far they'll go
+    origin: Optional[str] = None
+    travel_mode: Literal["walking", "bicycling", "transit", "driving"] = "walking"
+    max_travel_minutes: Optional[float] = None
+    max_distance_m: Optional[float] = None
+    # SearchStrategy filters; unset ones use the agent's defaults, null disables one
+    radius: Optional[int] = None
+    keyword: Optional[str] = None
+    open_now: Optional[bool] = None
+    # Only places open at this time; without a UTC offset it's local to each place
+    open_at: Optional[datetime] = None
+    min_rating: Optional[float] = None
+    max_price: Optional[int] = None
+
+    def strategy_overrides(self) -> Dict[str, Any]:
+        """The strategy filters the client set explicitly."""
+        fields = ("radius", "keyword", "open_now", "open_at", "min_rating", "max_price")
+        overrides = {name: getattr(self, name) for name in fields if name in self.model_fields_set}
+        if overrides.get("open_at"):
+            overrides["open_at"] = overrides["open_at"].isoformat()
+        return overrides
 
 class Restaurant(BaseModel):
     name: str
@@ -63,13 +223,17 @@ class Restaurant(BaseModel):
     formatted_phone_number: Optional[str] = None
     opening_hours: Optional[dict] = None
     geometry: dict
+    distance: Optional[float] = None  # km
+    travel_time: Optional[int] = None  # minutes
+    travel_mode: Optional[str] = None
 
 class SearchStrategy(BaseModel):
     location: str
-    radius: int
+    radius: Optional[int] = None
     type: str
     keyword: Optional[str] = None
     open_now: Optional[bool] = None
+    open_at: Optional[str] = None
     min_rating: Optional[float] = None
     max_price: Optional[int] = None
 
@@ -84,10 +248,16 @@ class SearchResult(BaseModel):
     restaurants: List[Restaurant]
     analysis: Analysis
 
-def optimize_query_with_llama(query: str) -> str:
+def _llm(timeout: Optional[float]) -> "OpenAI":
+    """The Kluster client, without retries when the call has a time budget."""
+    if timeout is None:
+        return get_llm_client()
+    return get_llm_client().with_options(timeout=timeout, max_retries=0)
+
+def optimize_query_with_llama(query: str, timeout: Optional[float] = None) -> str:
     """Use LLaMA to optimize the search query for Google Maps MCP."""
     try:
-        completion = client.chat.completions.create(
+        completion = _llm(timeout).chat.completions.create(
             model="meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
             max_completion_tokens=200,
             temperature=0.5,  # Increased temperature for more creativity
@@ -130,24 +300,54 @@ Return ONLY the optimized search query, no explanations."""
         logger.error(f"Error optimizing query with LLaMA: {str(e)}")
         return query
 
-def analyze_with_llama(query: str, restaurants: List[Dict[str, Any]]) -> str:
-    """Use LLaMA to analyze restaurants and provide personalized recommendations."""
+def optimize_query(query: str, timeout: Optional[float] = None) -> Tuple[str, bool]:
+    """
+    Optimize the search query with the configured optimizer.
+
+    Returns the query to search for and whether optimization was skipped
+    because `timeout` left too little time to ask LLaMA.
+    """
+    if QUERY_OPTIMIZER == "local":
+        rewrite = rewrite_query(query)
+        if rewrite.confidence >= QUERY_OPTIMIZER_MIN_CONFIDENCE:
+            logger.info(f"Local optimized query: {rewrite.query} (confidence {rewrite.confidence})")
+            return rewrite.query, False
+        logger.info(f"Local optimizer confidence {rewrite.confidence} too low, falling back to LLaMA")
+    if timeout is not None and timeout < MIN_OPTIMIZE_SECONDS:
+        logger.warning(f"Only {timeout:.2f}s left, searching with the unoptimized query")
+        return query, True
+    return optimize_query_with_llama(query, timeout), False
+
+def heuristic_recommendations(restaurants: List[RestaurantRecord], when: Optional[datetime] = None) -> str:
+    """Rating-based recommendations for when LLaMA is unavailable or out of time."""
+    lines = ["Top picks by rating and popularity:"]
+    top = rank_candidates(restaurants)[:5]
+    at = "now" if when is None else f"at {when:%a %H:%M}"
+    for i, (r, status) in enumerate(zip(top, open_statuses(top, when)), 1):
+        line = f"{i}. {r.name} - {r.rating} stars ({r.user_ratings_total} reviews), {r.vicinity}"
+        if status is not None:
+            line += f", open {at}" if status[0] else f", closed {at}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def analyze_with_llama(
+    query: str,
+    restaurants: List[RestaurantRecord],
+    timeout: Optional[float] = None,
+    now: Optional[datetime] = None,
+) -> Tuple[str, bool]:
+    """
+    Use LLaMA to analyze restaurants and provide personalized recommendations.
+
+    Returns the recommendations and whether they are the heuristic ones
+    because the LLaMA call failed.
+    """
     try:
-        # Prepare restaurant details
-        restaurant_details = []
-        for r in restaurants:
-            details = {
-                "name": r.get("name", "Unknown"),
-                "rating": r.get("rating", 0),
-                "reviews": r.get("user_ratings_total", 0),
-                "address": r.get("vicinity", "Unknown location"),
-                "opening_hours": r.get("opening_hours", {}),
-                "website": r.get("website", "Not available"),
-                "phone": r.get("formatted_phone_number", "Not available")
-            }
-            restaurant_details.append(details)
-
-        completion = client.chat.completions.create(
+        # Send only the best candidates, as a compact table within the token budget
+        restaurant_table, included = encode_restaurants(restaurants, now=now)
+        logger.info(f"Sending {len(included)} of {len(restaurants)} restaurants to LLaMA")
+
+        completion = _llm(timeout).chat.completions.create(
             model="meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
             max_completion_tokens=1000,
             temperature=0.6,
@@ -170,8 +370,8 @@ Your task is to analyze restaurant options and provide personalized recommendati
 
 User Query: {query}
 
-Available Restaurants:
-{json.dumps(restaurant_details, indent=2)}
+Available Restaurants (one per line, fields separated by "|", "-" means unknown, "travel" is the time to get there from the user, "open" is whether it's open {"at " + now.isoformat() if now else "now"} and when that changes if soon, "today" is that day's opening hours):
+{restaurant_table}
 
 Provide:
 1. A ranked list of best matches
@@ -184,29 +384,90 @@ Format your response in a clear, structured way with sections and bullet points.
             ]
         )
         
-        return completion.choices[0].message.content.strip()
+        return completion.choices[0].message.content.strip(), False
     except Exception as e:
         logger.error(f"Error analyzing with LLaMA: {str(e)}")
-        return "Unable to generate personalized recommendations at this time."
+        return heuristic_recommendations(restaurants, now), True
+
+def _copy_search_results(results: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy the mutable parts of a find_restaurants result; records are shared."""
+    return {
+        **results,
+        'restaurants': list(results['restaurants']),
+        'analysis': dict(results['analysis']),
+    }
 
 @app.post("/api/restaurants/search")
-async def search_restaurants(request: SearchRequest):
+def search_restaurants(request: SearchRequest):
     logger.info(f"Search request received for query: {request.query}")
+    # Results with travel times or custom filters aren't shared between queries
+    shareable = not request.origin and not request.strategy_overrides()
+    # Loading the embedding model (on the first request without warm-up)
+    # isn't counted against the search deadline
+    semantic_cache = get_semantic_cache() if shareable else None
+    deadline = Deadline(SEARCH_DEADLINE_SECONDS if SEARCH_DEADLINE_SECONDS > 0 else None)
+    degraded = []
     try:
-        # Optimize the query using LLaMA
-        optimized_query = optimize_query_with_llama(request.query)
-        logger.info(f"Optimized query: {optimized_query}")
+        cached = semantic_cache.get(request.query) if semantic_cache else None
+        if cached:
+            optimized_query, cached_results = cached
+            logger.info(f"Reusing cached search for optimized query: {optimized_query}")
+        else:
+            # Optimize the query locally or using LLaMA, leaving time to search
+            optimize_budget = deadline.budget(cap=OPTIMIZE_TIMEOUT_SECONDS, reserve=MIN_SEARCH_SECONDS)
+            optimized_query, skipped = optimize_query(request.query, optimize_budget)
+            if skipped:
+                degraded.append('optimize')
+            logger.info(f"Optimized query: {optimized_query}")
         
         try:
-            # Get the search results from the agent
-            results = agent.find_restaurants(optimized_query)
-            logger.info(f"Search completed successfully. Found {len(results['restaurants'])} results")
+            if cached:
+                results = _copy_search_results(cached_results)
+                # Cached results were filtered on opening at the time they were
+                # cached; drop the places that have closed since
+                open_now = get_agent().filter_open(results['restaurants'], results['strategy'])
+                if len(open_now) < len(results['restaurants']):
+                    logger.info(f"Dropped {len(results['restaurants']) - len(open_now)} cached places that have closed")
+                    results['restaurants'] = open_now
+            else:
+                # Get the search results from the agent, leaving time to analyze
+                search_budget = max(
+                    deadline.budget(reserve=MIN_ANALYZE_SECONDS),
+                    min(MIN_SEARCH_SECONDS, deadline.remaining()),
+                )
+                results = get_agent().find_restaurants(
+                    optimized_query,
+                    deadline=Deadline(search_budget),
+                    origin=request.origin,
+                    travel_mode=request.travel_mode,
+                    max_travel_minutes=request.max_travel_minutes,
+                    max_distance_m=request.max_distance_m,
+                    strategy=request.strategy_overrides(),
+                )
+                logger.info(f"Search completed successfully. Found {len(results['restaurants'])} results")
+                degraded.extend(results.pop('degraded', []))
+                if semantic_cache and results['restaurants'] and not degraded:
+                    semantic_cache.put(request.query, (optimized_query, _copy_search_results(results)))
             
+            # Best first by review-weighted rating and travel time, as the LLaMA table
+            results['restaurants'] = rank_candidates(results['restaurants'])
+
             # Only run LLaMA analysis if we have restaurants
-            if results['restaurants']:
+            if results['restaurants'] and deadline.budget() < MIN_ANALYZE_SECONDS:
+                logger.warning("Out of time for LLaMA analysis, using heuristic recommendations")
+                degraded.append('analysis')
+                results['analysis']['recommendations'] = heuristic_recommendations(
+                    results['restaurants'], request.open_at
+                )
+            elif results['restaurants']:
                 # Get personalized recommendations using LLaMA
-                recommendations = analyze_with_llama(request.query, results['restaurants'])
-                logger.info("Generated personalized recommendations")
+                recommendations, fell_back = analyze_with_llama(
+                    request.query, results['restaurants'], deadline.timeout(), request.open_at
+                )
+                if fell_back:
+                    degraded.append('analysis')
+                else:
+                    logger.info("Generated personalized recommendations")
                 
                 # Add recommendations to the results
                 if 'analysis' not in results:
@@ -225,12 +486,13 @@ async def search_restaurants(request: SearchRequest):
                     'recommendations': 'No restaurants found. Try adjusting your search criteria or location.'
                 }
             
-            return results
+            results['degraded'] = degraded
+            return RecordJSONResponse(results)
             
         except ValueError as e:
             # Handle specific errors from the agent
             logger.warning(f"Search failed with ValueError: {str(e)}")
-            return {
+            return RecordJSONResponse({
                 'restaurants': [],
                 'strategy': {
                     'location': optimized_query,
@@ -242,20 +504,29 @@ async def search_restaurants(request: SearchRequest):
                     'concerns': [str(e)],
                     'score': 0.0,
                     'recommendations': 'Try adjusting your search criteria or location.'
-                }
-            }
+                },
+                'degraded': degraded
+            })
             
     except Exception as e:
         logger.error(f"Error searching restaurants: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/restaurants/{place_id}")
-async def get_restaurant_details(place_id: str):
+def get_restaurant_details(place_id: str):
     try:
-        details = agent._get_place_details(place_id)
+        details = get_agent()._get_place_details(place_id)
         if not details:
             raise HTTPException(status_code=404, detail="Restaurant not found")
-        return details
+        return RecordJSONResponse(details)
+    except HTTPException:
+        raise
+    except FuturesTimeoutError:
+        logger.error(f"Timed out getting details for {place_id}")
+        raise HTTPException(status_code=504, detail="Timed out waiting for the Places API")
+    except PlacesAPIError as e:
+        logger.error(f"Places API error getting details for {place_id}: {str(e)}")
+        raise HTTPException(status_code=502, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -270,7 +541,10 @@ async def health_check():
     return {
         "status": "ok",
         "version": "1.0.0",
-        "api_key_configured": bool(os.getenv("GOOGLE_MAPS_API_KEY"))
+        "api_key_configured": bool(os.getenv("GOOGLE_MAPS_API_KEY")),
+        "place_details": get_agent()._details_flight.stats(),
+        "semantic_cache": semantic_cache.stats() if semantic_cache else None,
+        "hedged_requests": get_agent().hedged_requests
     }
 
 if __name__ == "__main__":
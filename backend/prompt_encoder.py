@@ -0,0 +1,177 @@
+"""
+Compact encoding of restaurant candidates for LLM prompts.
+Created: 2025-04-17
+Changes:
+- Initial implementation of the tabular prompt encoder with top-K and token budget
+- Travel time to the user is shown and penalizes far away candidates
+- The open column is computed for all rows at once from the weekly hours
+  index, at any given time, and says when a place closes or opens soon
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse
+
+from google_maps_agent.hours import OpeningHoursIndex
+from google_maps_agent.records import RestaurantRecord
+
+# Defaults, overridable through the environment
+DEFAULT_TOP_K = int(os.getenv("LLM_PROMPT_TOP_K", "8"))
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "1200"))
+
+# Rough characters-per-token ratio for English/Spanish text with LLaMA tokenizers
+CHARS_PER_TOKEN = 4
+
+# Reviews needed before a rating is trusted as much as the candidate average
+RATING_PRIOR_WEIGHT = 50
+
+# Stars a candidate loses per minute of travel, so a place 25 minutes further
+# away needs a half star more to rank the same
+STARS_PER_TRAVEL_MINUTE = 0.02
+
+# Mention when a place closes or opens if it's within this many minutes
+SOON_MINUTES = 60
+
+MAX_FIELD_CHARS = 60
+
+# (open, minutes until that changes or None if unknown); None when nothing is known
+OpenStatus = Optional[Tuple[bool, Optional[int]]]
+
+COLUMNS = ["name", "rating", "reviews", "price", "address", "travel", "open", "today", "phone", "web"]
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate; good enough to enforce a prompt budget."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def rank_candidates(restaurants: List[RestaurantRecord]) -> List[RestaurantRecord]:
+    """
+    Order candidates by a review-weighted rating.
+
+    A 5.0 with 3 reviews ranks below a 4.6 with 2000: each rating is shrunk
+    towards the candidate average in proportion to how few reviews it has.
+    Candidates with a known travel time are penalized for distance.
+    """
+    if not restaurants:
+        return []
+    mean = sum(r.rating for r in restaurants) / len(restaurants)
+
+    def weighted(r: RestaurantRecord) -> float:
+        votes = r.user_ratings_total
+        score = (votes * r.rating + RATING_PRIOR_WEIGHT * mean) / (votes + RATING_PRIOR_WEIGHT)
+        if r.travel_time_s is not None:
+            score -= STARS_PER_TRAVEL_MINUTE * r.travel_time_s / 60.0
+        return score
+
+    return sorted(restaurants, key=weighted, reverse=True)
+
+
+def open_statuses(restaurants: List[RestaurantRecord], when: Optional[datetime] = None) -> List[OpenStatus]:
+    """
+    Whether each restaurant is open at `when` (default now) and for how long.
+
+    Computed in one pass from the weekly hours. For places without them
+    the API's open_now flag is used, but only when asking about the
+    current time; for any other time their status is unknown.
+    """
+    statuses: List[OpenStatus] = OpeningHoursIndex(restaurants).annotate(when or datetime.now(timezone.utc))
+    if when is None:
+        statuses = [
+            (r.open_now, None) if status is None and r.open_now is not None else status
+            for r, status in zip(restaurants, statuses)
+        ]
+    return statuses
+
+
+def summarize_hours(
+    restaurant: RestaurantRecord,
+    now: Optional[datetime] = None,
+    status: OpenStatus = None,
+) -> Tuple[str, str]:
+    """
+    Return (open, today's hours) as short strings, '-' when unknown.
+
+    `status` is the place's entry from open_statuses() at `now`.
+    """
+    open_text = "-"
+    if status is not None:
+        is_open, minutes = status
+        open_text = "yes" if is_open else "no"
+        if minutes is not None and minutes <= SOON_MINUTES:
+            open_text += f", {'closes' if is_open else 'opens'} in {minutes}min"
+    today = "-"
+    # weekday_text starts on Monday, like datetime.weekday()
+    if len(restaurant.weekday_text) == 7:
+        now = now or datetime.now()
+        if now.tzinfo is not None and restaurant.utc_offset is not None:
+            now = now.astimezone(timezone(timedelta(minutes=restaurant.utc_offset)))
+        text = restaurant.weekday_text[now.weekday()]
+        today = text.split(": ", 1)[-1]
+    return open_text, today
+
+
+def _cell(value) -> str:
+    if value is None or value == "":
+        return "-"
+    text = str(value).replace("|", "/").replace("\n", " ")
+    if len(text) > MAX_FIELD_CHARS:
+        text = text[:MAX_FIELD_CHARS - 1] + "…"
+    return text
+
+
+def encode_row(restaurant: RestaurantRecord, now: Optional[datetime] = None, status: OpenStatus = None) -> str:
+    """Encode one restaurant as a pipe-separated row matching COLUMNS."""
+    open_text, today = summarize_hours(restaurant, now, status)
+    web = urlparse(restaurant.website).netloc if restaurant.website else None
+    price = "$" * restaurant.price_level if restaurant.price_level else None
+    travel = None
+    if restaurant.travel_time_s is not None:
+        travel = f"{round(restaurant.travel_time_s / 60)}min {restaurant.travel_mode}"
+    return "|".join(_cell(v) for v in (
+        restaurant.name,
+        restaurant.rating,
+        restaurant.user_ratings_total,
+        price,
+        restaurant.vicinity,
+        travel,
+        open_text,
+        today,
+        restaurant.formatted_phone_number,
+        web,
+    ))
+
+
+def encode_restaurants(
+    restaurants: List[RestaurantRecord],
+    top_k: int = DEFAULT_TOP_K,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    now: Optional[datetime] = None,
+) -> Tuple[str, List[RestaurantRecord]]:
+    """
+    Encode the best candidates as a compact table for an LLM prompt.
+
+    Args:
+        restaurants: Candidates in any order
+        top_k: Maximum number of candidates to include
+        token_budget: Approximate token limit for the table; the
+            lowest-ranked rows are dropped until it fits (at least one row
+            is always kept)
+        now: Reference time for the open and "today" columns, defaults to
+            the current time; naive times are local to each place
+
+    Returns:
+        The encoded table and the restaurants it contains, best first
+    """
+    ranked = rank_candidates(restaurants)[:max(1, top_k)]
+    header = "|".join(COLUMNS)
+    statuses = open_statuses(ranked, now)
+    now = now or datetime.now(timezone.utc)
+    rows = [encode_row(r, now, status) for r, status in zip(ranked, statuses)]
+
+    tokens = estimate_tokens(header) + sum(estimate_tokens(row) for row in rows)
+    while len(rows) > 1 and tokens > token_budget:
+        tokens -= estimate_tokens(rows.pop())
+
+    return "\n".join([header] + rows), ranked[:len(rows)]
@@ -0,0 +1,138 @@
+"""
+Local rule-based query optimization.
+Created: 2025-04-19
+Changes:
+- Initial implementation of the cuisine/neighbourhood gazetteer rewriter
+- Queries mentioning more than one cuisine are left to the LLM
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# Phrase (accent-free, lowercase) -> cuisine label used in the optimized query
+CUISINES: Dict[str, str] = {
+    "japanese": "Japanese", "japonesa": "Japanese", "japones": "Japanese", "ramen": "ramen",
+    "sushi": "sushi", "omakase": "sushi", "izakaya": "Japanese",
+    "peruvian": "Peruvian", "peruana": "Peruvian", "peruano": "Peruvian", "ceviche": "Peruvian",
+    "cevicheria": "Peruvian",
+    "italian": "Italian", "italiana": "Italian", "pasta": "Italian", "trattoria": "Italian",
+    "pizza": "pizza", "pizzeria": "pizza",
+    "mexican": "Mexican", "mexicana": "Mexican", "taco": "Mexican", "tacos": "Mexican",
+    "taqueria": "Mexican", "burrito": "Mexican", "burritos": "Mexican",
+    "chinese": "Chinese", "china": "Chinese", "dim sum": "Chinese", "dumplings": "Chinese",
+    "korean": "Korean", "coreana": "Korean",
+    "thai": "Thai", "vietnamese": "Vietnamese", "pho": "Vietnamese",
+    "indian": "Indian", "india": "Indian", "curry": "Indian",
+    "middle eastern": "Middle Eastern", "arabe": "Middle Eastern", "falafel": "Middle Eastern",
+    "armenian": "Armenian", "armenia": "Armenian",
+    "spanish": "Spanish", "espanola": "Spanish", "tapas": "tapas",
+    "french": "French", "francesa": "French", "bistro": "French",
+    "argentinian": "Argentinian", "argentine": "Argentinian",
+    "parrilla": "parrilla", "asado": "parrilla", "steak": "steakhouse", "steakhouse": "steakhouse",
+    "empanadas": "empanadas", "empanada": "empanadas",
+    "burger": "burger", "burgers": "burger", "hamburguesa": "burger", "hamburguesas": "burger",
+    "vegan": "vegan", "vegana": "vegan", "vegetarian": "vegetarian", "vegetariana": "vegetarian",
+    "seafood": "seafood", "mariscos": "seafood", "pescado": "seafood",
+    "brunch": "brunch", "breakfast": "breakfast", "desayuno": "breakfast",
+    "cafe": "cafe", "coffee": "cafe", "cafeteria": "cafe",
+    "bar": "bar", "cocktail": "cocktail bar", "cocktails": "cocktail bar", "wine bar": "wine bar",
+    "ice cream": "ice cream", "helado": "ice cream", "heladeria": "ice cream",
+    "bakery": "bakery", "panaderia": "bakery",
+}
+
+# Phrase (accent-free, lowercase) -> neighbourhood used in the optimized query
+NEIGHBOURHOODS: Dict[str, str] = {
+    "palermo": "Palermo", "palermo soho": "Palermo", "palermo hollywood": "Palermo",
+    "palermo chico": "Palermo", "las canitas": "Palermo", "plaza serrano": "Palermo",
+    "belgrano": "Belgrano", "barrio chino": "Belgrano", "av cabildo": "Belgrano", "cabildo": "Belgrano",
+    "recoleta": "Recoleta", "barrio norte": "Recoleta",
+    "san telmo": "San Telmo", "la boca": "La Boca", "puerto madero": "Puerto Madero",
+    "villa crespo": "Villa Crespo", "colegiales": "Colegiales", "chacarita": "Chacarita",
+    "almagro": "Almagro", "caballito": "Caballito", "nunez": "Núñez", "saavedra": "Saavedra",
+    "villa urquiza": "Villa Urquiza", "retiro": "Retiro", "microcentro": "Microcentro",
+    "san nicolas": "San Nicolás", "monserrat": "Monserrat", "balvanera": "Balvanera",
+    "boedo": "Boedo", "flores": "Flores", "coghlan": "Coghlan",
+    "villa devoto": "Villa Devoto", "villa del parque": "Villa del Parque",
+    "parque patricios": "Parque Patricios", "barracas": "Barracas",
+    "olivos": "Olivos", "vicente lopez": "Vicente López", "martinez": "Martínez",
+    "san isidro": "San Isidro", "tigre": "Tigre",
+}
+
+# Words that signal a location we might not know about
+_LOCATION_HINT = re.compile(r"\b(in|near|around|en|cerca de)\s+\w")
+
+
+def _fold(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+def _compile(phrases) -> re.Pattern:
+    # Longest phrases first so "palermo soho" wins over "palermo"
+    alternation = "|".join(re.escape(p) for p in sorted(phrases, key=len, reverse=True))
+    return re.compile(rf"\b({alternation})\b")
+
+
+_CUISINE_PATTERN = _compile(CUISINES)
+_NEIGHBOURHOOD_PATTERN = _compile(NEIGHBOURHOODS)
+
+
+@dataclass
+class QueryRewrite:
+    """Result of a local query rewrite."""
+
+    query: str
+    confidence: float
+    cuisine: Optional[str] = None
+    neighbourhood: Optional[str] = None
+
+
+def rewrite_query(query: str) -> QueryRewrite:
+    """
+    Turn a free-form request into a short Google Maps search query.
+
+    "Authentic Peruvian cevicheria in Belgrano near Av. Cabildo" becomes
+    "Peruvian restaurant Belgrano". Confidence is high only when both a
+    cuisine and a known neighbourhood were found; callers should fall back
+    to the LLM below their threshold. Queries naming several cuisines
+    ("vegan sushi", "not pizza, something Japanese") keep the first one
+    but with low confidence, as picking one may change their meaning.
+    """
+    folded = _fold(query)
+    cuisines = list(dict.fromkeys(CUISINES[phrase] for phrase in _CUISINE_PATTERN.findall(folded)))
+    neighbourhood_match = _NEIGHBOURHOOD_PATTERN.search(folded)
+    cuisine = cuisines[0] if cuisines else None
+    neighbourhood = NEIGHBOURHOODS[neighbourhood_match.group(1)] if neighbourhood_match else None
+
+    if len(cuisines) > 1:
+        confidence = 0.4
+    elif cuisine and neighbourhood:
+        confidence = 0.9
+    elif neighbourhood:
+        confidence = 0.6
+    elif cuisine:
+        # A location we don't know is worse than no location at all
+        confidence = 0.3 if _LOCATION_HINT.search(folded) else 0.5
+    else:
+        confidence = 0.0
+
+    parts = []
+    if cuisine:
+        parts.append(cuisine)
+    # Places that aren't restaurants keep their own type
+    if cuisine not in ("cafe", "bar", "cocktail bar", "wine bar", "ice cream", "bakery"):
+        parts.append("restaurant")
+    if neighbourhood:
+        parts.append(neighbourhood)
+
+    return QueryRewrite(
+        query=" ".join(parts),
+        confidence=confidence,
+        cuisine=cuisine,
+        neighbourhood=neighbourhood,
+    )
@@ -0,0 +1,233 @@
+"""
+Semantic cache for search queries.
+Created: 2025-04-18
+Changes:
+- Initial implementation of SemanticCache with a local sentence embedder
+- put() reuses the embedding computed by the get() that missed
+- Optional scope (e.g. the neighbourhood) that must match before a similar
+  query's entry is reused
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Embeddings of missed queries kept for the put() that usually follows
+MISSED_VECTORS = 256
+
+
+class LocalEmbedder:
+    """
+    Sentence embeddings from a small transformer running on the CPU.
+
+    `transformers`, `torch` and `numpy` are imported here rather than at module
+    level so the backend can start without them when the cache is disabled.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL, num_threads: Optional[int] = None):
+        import numpy as np
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self._np = np
+        self._torch = torch
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = AutoModel.from_pretrained(model_name).to("cpu").eval()
+        self.dim = self.model.config.hidden_size
+        # Models are not guaranteed to be safe for concurrent forward passes
+        self._lock = threading.Lock()
+        logger.info(f"Loaded embedding model {model_name} ({self.dim} dims)")
+
+    def __call__(self, text: str):
+        """Return the L2-normalized mean-pooled embedding of `text` as float32."""
+        torch = self._torch
+        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=64)
+        with self._lock, torch.inference_mode():
+            hidden = self.model(**inputs).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, dim=1)
+        return pooled[0].numpy().astype(self._np.float32)
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form used for exact-match lookups."""
+    return " ".join(query.lower().split())
+
+
+class SemanticCache:
+    """
+    Cache values by query meaning rather than exact text.
+
+    Embeddings live in a fixed-size matrix with one row per slot, so a lookup
+    is a single matrix-vector product over all cached queries. Entries expire
+    after `ttl_seconds` and the least recently used entry is evicted when the
+    cache is full.
+
+    Queries can differ in a few words that embeddings barely notice ("sushi in
+    Palermo" vs "sushi in Recoleta"). If `scope` is given, it maps a query to
+    the part that must match exactly, and only entries with the same scope
+    are considered similar.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Any],
+        dim: int,
+        threshold: float = 0.92,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600.0,
+        scope: Optional[Callable[[str], Hashable]] = None,
+    ):
+        import numpy as np
+
+        self._np = np
+        self.embed = embed
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.scope = scope
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((max_entries, dim), dtype=np.float32)
+        self._valid = np.zeros(max_entries, dtype=bool)
+        # Small integer id of each slot's scope, so a lookup can mask other scopes
+        self._scope_ids = np.zeros(max_entries, dtype=np.int32)
+        self._scope_index: Dict[Hashable, int] = {}
+        self._entries: List[Optional[Tuple[str, float, Any]]] = [None] * max_entries
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._by_key: Dict[str, int] = {}
+        self._missed: "OrderedDict[str, Any]" = OrderedDict()
+
+        self.hits = 0
+        self.exact_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, query: str) -> Optional[Any]:
+        """Return the value cached for `query` or a semantically similar one."""
+        key = normalize_query(query)
+        now = time.monotonic()
+        with self._lock:
+            slot = self._by_key.get(key)
+            if slot is not None and self._fresh(slot, now):
+                self._lru.move_to_end(slot)
+                self.hits += 1
+                self.exact_hits += 1
+                return self._entries[slot][2]
+
+        vector = self.embed(key)
+        scope = self.scope(key) if self.scope else None
+
+        with self._lock:
+            if not self._valid.any():
+                self._miss(key, vector)
+                return None
+            scores = self._vectors @ vector
+            scores[~self._valid] = -1.0
+            if self.scope:
+                scores[self._scope_ids != self._scope_id(scope)] = -1.0
+            slot = int(scores.argmax())
+            score = float(scores[slot])
+            if score < self.threshold or not self._fresh(slot, now):
+                self._miss(key, vector)
+                return None
+            self._lru.move_to_end(slot)
+            self.hits += 1
+            logger.info(f"Semantic cache hit ({score:.3f}): {query!r} ~ {self._entries[slot][0]!r}")
+            return self._entries[slot][2]
+
+    def put(self, query: str, value: Any):
+        """Cache `value` for `query`, evicting the least recently used entry if full."""
+        key = normalize_query(query)
+        with self._lock:
+            vector = self._missed.pop(key, None)
+        if vector is None:
+            vector = self.embed(key)
+        scope = self.scope(key) if self.scope else None
+        with self._lock:
+            slot = self._by_key.get(key)
+            if slot is None:
+                if not self._free:
+                    self._evict(next(iter(self._lru)))
+                    self.evictions += 1
+                slot = self._free.pop()
+                self._by_key[key] = slot
+            self._vectors[slot] = vector
+            self._valid[slot] = True
+            self._scope_ids[slot] = self._scope_id(scope)
+            self._entries[slot] = (key, time.monotonic(), value)
+            self._lru[slot] = None
+            self._lru.move_to_end(slot)
+
+    def _miss(self, key: str, vector: Any):
+        # Caller holds the lock
+        self.misses += 1
+        self._missed[key] = vector
+        self._missed.move_to_end(key)
+        while len(self._missed) > MISSED_VECTORS:
+            self._missed.popitem(last=False)
+
+    def _scope_id(self, scope: Hashable) -> int:
+        # Caller holds the lock
+        return self._scope_index.setdefault(scope, len(self._scope_index))
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._lru):
+                self._evict(slot)
+            self._missed.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._lru),
+                "hits": self.hits,
+                "exact_hits": self.exact_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "threshold": self.threshold,
+            }
+
+    def _fresh(self, slot: int, now: float) -> bool:
+        """Check an entry's TTL, dropping it if expired. Caller holds the lock."""
+        if now - self._entries[slot][1] <= self.ttl_seconds:
+            return True
+        self._evict(slot)
+        return False
+
+    def _evict(self, slot: int):
+        """Free a slot. Caller holds the lock."""
+        key = self._entries[slot][0]
+        self._by_key.pop(key, None)
+        self._entries[slot] = None
+        self._valid[slot] = False
+        self._lru.pop(slot, None)
+        self._free.append(slot)
+
+
+def create_semantic_cache(
+    model_name: str = DEFAULT_MODEL,
+    threshold: float = 0.92,
+    max_entries: int = 1024,
+    ttl_seconds: float = 3600.0,
+    scope: Optional[Callable[[str], Hashable]] = None,
+) -> Optional[SemanticCache]:
+    """Build a SemanticCache, or return None if the embedding model can't be loaded."""
+    try:
+        embedder = LocalEmbedder(model_name)
+    except Exception as e:
+        logger.error(f"Semantic cache disabled, could not load {model_name}: {str(e)}")
+        return None
+    return SemanticCache(embedder, embedder.dim, threshold, max_entries, ttl_seconds, scope)
@@ -0,0 +1,134 @@
+"""
+Cold start benchmark.
+Created: 2025-04-22
+Changes:
+- Initial implementation: time import, lifespan startup and first request
+  of an ASGI app in fresh interpreters
+
+Each run starts a new Python process that imports the app, runs its lifespan
+startup and serves one request in-process, so the numbers are what a new
+worker pays before it can answer traffic.
+
+Usage (from the directory containing the app module):
+    poetry run python startup_benchmark.py main:app --runs 10
+    poetry run python ../../backend/startup_benchmark.py server:app --path /openapi.json --no-lifespan
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Runs in the child process; prints one JSON line with its timings
+CHILD = r"""
+import asyncio, importlib, json, sys, time
+start = time.perf_counter()
+module_name, app_name, path, lifespan = sys.argv[1], sys.argv[2], sys.argv[3], sys.argv[4] == "1"
+module = importlib.import_module(module_name)
+app = getattr(module, app_name)
+imported = time.perf_counter()
+
+async def serve():
+    import httpx
+    timings = {}
+    async def first_request():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            response = await client.get(path)
+            timings["status"] = response.status_code
+    if lifespan:
+        async with app.router.lifespan_context(app):
+            timings["ready"] = time.perf_counter()
+            await first_request()
+            timings["first_request"] = time.perf_counter()
+    else:
+        timings["ready"] = time.perf_counter()
+        await first_request()
+        timings["first_request"] = time.perf_counter()
+    return timings
+
+timings = asyncio.run(serve())
+print(json.dumps({
+    "import": imported - start,
+    "startup": timings["ready"] - imported,
+    "first_request": timings["first_request"] - timings["ready"],
+    "status": timings["status"],
+}))
+"""
+
+
+def _env() -> dict:
+    env = dict(os.environ)
+    # Clients check for their keys at construction; no upstream call is made
+    for key in ("GOOGLE_MAPS_API_KEY", "KLUSTER_AI_API_KEY", "GEMINI_API_KEY"):
+        env.setdefault(key, "benchmark")
+    return env
+
+
+def run_once(app: str, path: str, lifespan: bool) -> dict:
+    module_name, app_name = app.split(":")
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", CHILD, module_name, app_name, path, "1" if lifespan else "0"],
+        env=_env(), capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        sys.exit(f"Cold start of {app} failed:\n{process.stderr}")
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - started
+    return result
+
+
+def slowest_imports(module_name: str, top: int):
+    """The `top` slowest direct imports of a module by cumulative time, from `-X importtime`."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        env=_env(), capture_output=True, text=True,
+    ).stderr
+    # Nesting is shown by two spaces per level and children are listed
+    # before their parent, so collect depth 1 rows until the module appears
+    children = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module_name:
+                return sorted(children, reverse=True)[:top]
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start time of an ASGI app")
+    parser.add_argument("app", nargs="?", default="main:app", help="module:attribute of the app")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to start")
+    parser.add_argument("--path", default="/", help="path of the first request")
+    parser.add_argument("--no-lifespan", action="store_true",
+                        help="skip lifespan startup, e.g. when it needs external services")
+    parser.add_argument("--imports", type=int, default=10, help="slowest imports to list (0 to skip)")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.app, args.path, not args.no_lifespan) for _ in range(args.runs)]
+    print(f"{args.app}: {args.runs} cold starts, first request GET {args.path} -> {runs[0]['status']}")
+    print(f"{'stage':<15} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for stage in ("import", "startup", "first_request", "process"):
+        values = [r[stage] * 1000 for r in runs]
+        print(f"{stage:<15} {statistics.median(values):>10.1f} {min(values):>8.1f} {max(values):>8.1f}")
+
+    if args.imports:
+        print(f"\nSlowest imports of {args.app.split(':')[0]}:")
+        for us, name in slowest_imports(args.app.split(":")[0], args.imports):
+            print(f"{us / 1000:>10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
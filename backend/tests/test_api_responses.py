@@ -0,0 +1,39 @@
+"""Tests for RecordJSONResponse encoding."""
+
+import json
+
+import pytest
+
+import api_responses
+from api_responses import RecordJSONResponse
+from google_maps_agent.records import RestaurantRecord
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run each test with orjson and with the standard library fallback."""
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(api_responses, "orjson", None)
+    return request.param
+
+
+def test_records_are_encoded_nested_in_the_content(encoder):
+    record = RestaurantRecord("p1", "Café Tortoni", rating=4.4, lat=-34.6, lng=-58.4)
+    response = RecordJSONResponse({"restaurants": [record], "degraded": []})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"restaurants": [record.to_dict()], "degraded": []}
+    # Compact, with non-ASCII characters left as UTF-8
+    assert "Café Tortoni".encode("utf-8") in response.body
+    assert b'", "' not in response.body
+
+
+def test_a_single_record_is_encoded(encoder):
+    record = RestaurantRecord("p1", "Bar", travel_time_s=600.0)
+    assert json.loads(RecordJSONResponse(record).body)["travel_time"] == 10
+
+
+def test_unknown_types_are_rejected(encoder):
+    with pytest.raises(TypeError):
+        RecordJSONResponse({"when": object()})
@@ -0,0 +1,58 @@
+"""Tests for the compact LLM prompt table."""
+
+from datetime import datetime
+
+from google_maps_agent.records import RestaurantRecord
+from prompt_encoder import COLUMNS, encode_restaurants, estimate_tokens, rank_candidates
+
+NOW = datetime(2025, 4, 23, 20, 0)
+
+
+def candidates(count):
+    return [
+        RestaurantRecord(f"p{i}", f"Place {i}", rating=3.0 + i * 0.1, user_ratings_total=500)
+        for i in range(count)
+    ]
+
+
+def test_ratings_with_few_reviews_are_shrunk_towards_the_average():
+    few = RestaurantRecord("few", "Few reviews", rating=5.0, user_ratings_total=3)
+    many = RestaurantRecord("many", "Many reviews", rating=4.6, user_ratings_total=2000)
+    average = RestaurantRecord("avg", "Average", rating=3.5, user_ratings_total=800)
+    assert [r.place_id for r in rank_candidates([few, average, many])] == ["many", "few", "avg"]
+
+
+def test_only_the_top_k_are_encoded_best_first():
+    table, included = encode_restaurants(candidates(12), top_k=3, now=NOW)
+    lines = table.split("\n")
+    assert lines[0] == "|".join(COLUMNS)
+    assert [r.place_id for r in included] == ["p11", "p10", "p9"]
+    assert [line.split("|")[0] for line in lines[1:]] == ["Place 11", "Place 10", "Place 9"]
+
+
+def test_lowest_ranked_rows_are_dropped_to_fit_the_budget():
+    restaurants = candidates(8)
+    full, _ = encode_restaurants(restaurants, top_k=8, token_budget=10_000, now=NOW)
+    rows = full.split("\n")
+    budget = sum(estimate_tokens(line) for line in rows[:4])
+    table, included = encode_restaurants(restaurants, top_k=8, token_budget=budget, now=NOW)
+    assert table.split("\n") == rows[:4]
+    assert [r.place_id for r in included] == ["p7", "p6", "p5"]
+
+
+def test_one_row_is_kept_however_small_the_budget():
+    table, included = encode_restaurants(candidates(5), top_k=5, token_budget=1, now=NOW)
+    assert len(table.split("\n")) == 2
+    assert len(included) == 1
+
+
+def test_cells_are_escaped_and_truncated():
+    record = RestaurantRecord(
+        "p1", "Bar | Grill", rating=4.0, vicinity="x" * 100,
+        price_level=2, website="https://www.example.com/menu",
+    )
+    row = encode_restaurants([record], now=NOW)[0].split("\n")[1].split("|")
+    cells = dict(zip(COLUMNS, row))
+    assert cells["name"] == "Bar / Grill"
+    assert len(cells["address"]) == 60 and cells["address"].endswith("…")
+    assert (cells["price"], cells["web"], cells["phone"]) == ("$$", "www.example.com", "-")
@@ -0,0 +1,38 @@
+"""Tests for the local query rewriter."""
+
+import pytest
+
+from query_rewriter import rewrite_query
+
+# Default QUERY_OPTIMIZER_MIN_CONFIDENCE
+THRESHOLD = 0.8
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Authentic Peruvian cevicheria in Belgrano near Av. Cabildo", "Peruvian restaurant Belgrano"),
+    ("High-end sushi with omakase near Palermo Soho", "sushi restaurant Palermo"),
+    ("Traditional Italian with homemade pasta in Recoleta", "Italian restaurant Recoleta"),
+    ("Parrilla en San Telmo", "parrilla restaurant San Telmo"),
+    ("un buen café en Núñez", "cafe Núñez"),
+])
+def test_confident_rewrites(query, expected):
+    rewrite = rewrite_query(query)
+    assert rewrite.query == expected
+    assert rewrite.confidence >= THRESHOLD
+
+
+@pytest.mark.parametrize("query", [
+    "vegan sushi in Palermo",
+    "not pizza, something Japanese in Belgrano",
+])
+def test_several_cuisines_fall_back_to_the_llm(query):
+    assert rewrite_query(query).confidence < THRESHOLD
+
+
+@pytest.mark.parametrize("query", [
+    "sushi in Springfield",  # unknown location
+    "somewhere nice in Palermo",  # no cuisine
+    "dinner",
+])
+def test_incomplete_queries_fall_back_to_the_llm(query):
+    assert rewrite_query(query).confidence < THRESHOLD
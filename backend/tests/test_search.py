@@ -0,0 +1,62 @@
+"""Tests for the search endpoint's degraded stages."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from google_maps_agent.records import RestaurantRecord
+
+RESTAURANTS = [
+    RestaurantRecord("p1", "Don Julio", rating=4.7, user_ratings_total=5000),
+    RestaurantRecord("p2", "El Preferido", rating=4.6, user_ratings_total=800),
+]
+
+
+class FakeAgent:
+    def find_restaurants(self, query, **kwargs):
+        return {
+            "restaurants": list(RESTAURANTS),
+            "strategy": {"location": "current location", "radius": 5000, "type": "restaurant"},
+            "analysis": {"matching_factors": [], "concerns": [], "score": 4.6},
+            "degraded": [],
+        }
+
+
+class FailingLLM:
+    def __getattr__(self, name):
+        raise ConnectionError("Kluster is down")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "get_agent", lambda: FakeAgent())
+    monkeypatch.setattr(main, "get_semantic_cache", lambda: None)
+    monkeypatch.setattr(main, "QUERY_OPTIMIZER", "local")
+    monkeypatch.setattr(main, "_llm", lambda timeout: FailingLLM())
+    return TestClient(main.app)
+
+
+def test_analysis_falling_back_after_an_llm_error_is_degraded(client):
+    data = client.post("/api/restaurants/search", json={"query": "parrilla en Palermo"}).json()
+    assert data["degraded"] == ["analysis"]
+    assert data["analysis"]["recommendations"].startswith("Top picks by rating and popularity:")
+    assert "Don Julio" in data["analysis"]["recommendations"]
+
+
+def test_analyze_with_llama_reports_the_fallback(monkeypatch):
+    monkeypatch.setattr(main, "_llm", lambda timeout: FailingLLM())
+    recommendations, fell_back = main.analyze_with_llama("parrilla", RESTAURANTS)
+    assert fell_back
+    assert recommendations == main.heuristic_recommendations(RESTAURANTS)
+
+
+def test_results_are_ranked_with_travel_time(client, monkeypatch):
+    far = RESTAURANTS[0].replace(travel_time_s=40 * 60.0, travel_mode="walking")
+    near = RESTAURANTS[1].replace(travel_time_s=5 * 60.0, travel_mode="walking")
+    agent = FakeAgent()
+    monkeypatch.setattr(agent, "find_restaurants", lambda query, **kwargs: {
+        **FakeAgent().find_restaurants(query), "restaurants": [far, near],
+    })
+    monkeypatch.setattr(main, "get_agent", lambda: agent)
+    data = client.post("/api/restaurants/search", json={"query": "parrilla", "origin": "-34.58,-58.43"}).json()
+    assert [r["name"] for r in data["restaurants"]] == ["El Preferido", "Don Julio"]
@@ -0,0 +1,114 @@
+"""Tests for the semantic query cache, with a fake embedder."""
+
+import pytest
+
+pytest.importorskip("numpy")
+import numpy as np
+
+import semantic_cache
+from query_rewriter import rewrite_query
+from semantic_cache import SemanticCache
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+# Similarity to "sushi palermo": 1.0, ~0.995, ~0.71
+VECTORS = {
+    "sushi palermo": unit(1, 0, 0),
+    "sushi in palermo": unit(1, 0.1, 0),
+    "sushi in recoleta": unit(1, 0.1, 0),
+    "sushi": unit(1, 0.1, 0),
+    "pizza palermo": unit(1, 1, 0),
+    "tacos": unit(0, 0, 1),
+}
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text):
+        self.calls.append(text)
+        return VECTORS[text]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(semantic_cache, "time", clock)
+    return clock
+
+
+def make_cache(**kwargs):
+    return SemanticCache(FakeEmbedder(), 3, **kwargs)
+
+
+def test_exact_and_similar_queries_hit():
+    cache = make_cache(threshold=0.9)
+    cache.put("sushi palermo", "results")
+    assert cache.get("  Sushi   PALERMO ") == "results"
+    assert cache.get("sushi in palermo") == "results"
+    assert cache.stats()["hits"] == 2 and cache.stats()["exact_hits"] == 1
+
+
+def test_queries_below_the_threshold_miss():
+    cache = make_cache(threshold=0.9)
+    cache.put("sushi palermo", "results")
+    assert cache.get("pizza palermo") is None
+    assert cache.get("tacos") is None
+    assert cache.stats()["misses"] == 2
+
+
+def test_similar_queries_need_the_same_scope():
+    cache = make_cache(threshold=0.9, scope=lambda query: rewrite_query(query).neighbourhood)
+    cache.put("sushi palermo", "palermo results")
+    assert cache.get("sushi in recoleta") is None
+    assert cache.get("sushi") is None
+    assert cache.get("sushi in palermo") == "palermo results"
+    cache.put("sushi in recoleta", "recoleta results")
+    assert cache.get("sushi in recoleta") == "recoleta results"
+
+
+def test_entries_expire(clock):
+    cache = make_cache(ttl_seconds=60)
+    cache.put("sushi palermo", "results")
+    clock.now += 59
+    assert cache.get("sushi in palermo") == "results"
+    clock.now += 2
+    assert cache.get("sushi palermo") is None
+    assert cache.get("sushi in palermo") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    cache.put("sushi palermo", "sushi")
+    cache.put("tacos", "tacos")
+    assert cache.get("sushi palermo") == "sushi"
+    cache.put("pizza palermo", "pizza")
+    assert cache.get("tacos") is None
+    assert cache.get("sushi palermo") == "sushi"
+    assert cache.get("pizza palermo") == "pizza"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_put_reuses_the_embedding_of_the_missed_get():
+    cache = make_cache()
+    assert cache.get("tacos") is None
+    cache.put("tacos", "results")
+    assert cache.embed.calls == ["tacos"]
+    # Only once: a second put embeds again
+    cache.put("tacos", "newer results")
+    assert cache.embed.calls == ["tacos", "tacos"]
+    assert cache.get("tacos") == "newer results"
@@ -3,9 +3,22 @@ Google Maps Agent package.
 Created: 2024-03-21
 Changes:
 - Added RestaurantFinderAgent import
+- Exported SingleFlight
+- Exported RestaurantRecord
+- Exported Deadline
+- Exported SQLiteCache
+- Exported TravelTimes
+- Exported OpeningHoursIndex
+- Exported PlacesAPIError
 """
 
-from .agent import RestaurantFinderAgent
+from .agent import PlacesAPIError, RestaurantFinderAgent
+from .cache import SQLiteCache
+from .deadline import Deadline
+from .distance import TravelTimes
+from .hours import OpeningHoursIndex
+from .records import RestaurantRecord
+from .singleflight import SingleFlight
 
 __version__ = "0.1.0"
-__all__ = ["RestaurantFinderAgent"] 
\ No newline at end of file
+__all__ = ["Deadline", "OpeningHoursIndex", "PlacesAPIError", "RestaurantFinderAgent", "RestaurantRecord", "SingleFlight", "SQLiteCache", "TravelTimes"] 
\ No newline at end of file
@@ -4,21 +4,73 @@ Created: 2024-03-21
 Changes:
 - Initial implementation of RestaurantFinderAgent class
 - Added better handling of ZERO_RESULTS and location validation
+- Coalesced concurrent place details lookups and fetched details in parallel
+- Place details are returned as compact RestaurantRecord objects
+- Added request deadlines, upstream timeouts and hedged Places requests
+- Added optional place details cache shared between processes (PLACES_CACHE_PATH)
+- Added a distance-aware stage: straight-line prefilter, one batched Distance
+  Matrix request for the nearest candidates, travel time filters
+- Search strategy filters are sent to the Places API where supported and
+  applied to search results before details are fetched, which stop once
+  enough places pass
+- Opening filters use the precomputed weekly hours of all candidates in one
+  pass and accept an arbitrary time (open_at) besides open now
+- Place details errors and timeouts reach every caller waiting on the
+  request (PlacesAPIError, TimeoutError) instead of looking like a missing place
+- Upstream calls are skipped once the deadline has passed instead of being
+  sent with a zero timeout
+- Travel times are looked up for the nearest results, including those whose
+  details came from later batches than the first
 """
 
 import json
 import logging
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, wait
+from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Union
 
 import requests
 from dotenv import load_dotenv
 import os
 
+from .cache import SQLiteCache
+from .deadline import Deadline
+from .distance import (
+    MAX_DESTINATIONS,
+    LatLng,
+    TravelTimes,
+    estimate_travel_time,
+    max_reachable_distance,
+    parse_coordinates,
+    straight_line_distances,
+)
+from .hours import OpeningHoursIndex
+from .records import RestaurantRecord
+from .singleflight import SingleFlight
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Filters applied when the caller doesn't set them, as in the backend's SearchStrategy
+DEFAULT_STRATEGY = {
+    "location": "current location",
+    "radius": 5000,
+    "type": "restaurant",
+    "keyword": None,
+    "open_now": True,
+    "open_at": None,
+    "min_rating": 4.0,
+    "max_price": None
+}
+
+class PlacesAPIError(Exception):
+    """The Places API couldn't be reached or answered with an error status."""
+
+
 class RestaurantFinderAgent:
     """Agent for finding and analyzing restaurants using Google Maps API."""
     
@@ -32,80 +84,468 @@ class RestaurantFinderAgent:
         self.base_url = "https://maps.googleapis.com/maps/api/place"
         self.search_url = f"{self.base_url}/textsearch/json"
         self.details_url = f"{self.base_url}/details/json"
+
+        # Concurrent lookups of the same place share one upstream request
+        self._details_flight = SingleFlight()
+        self.details_wait_timeout = float(os.getenv("PLACE_DETAILS_WAIT_TIMEOUT", "10"))
+        # Sized like the server's threadpool (40 by default), so the pool
+        # doesn't cap how many searches can fetch details at the same time
+        details_workers = int(os.getenv("PLACE_DETAILS_WORKERS", "40"))
+        self._details_pool = ThreadPoolExecutor(
+            max_workers=details_workers,
+            thread_name_prefix="place-details",
+        )
+        # Geocoding and Distance Matrix lookups don't queue behind details
+        self._travel_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("DISTANCE_WORKERS", "4")),
+            thread_name_prefix="travel-times",
+        )
+
+        # Upstream timeouts; a slow Places request is duplicated after the hedge delay
+        self.request_timeout = float(os.getenv("PLACES_REQUEST_TIMEOUT", "10"))
+        self.hedge_delay = float(os.getenv("PLACES_HEDGE_DELAY_MS", "0")) / 1000.0
+        self.hedged_requests = 0
+        self._hedge_lock = threading.Lock()
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PLACES_HEDGE_WORKERS", str(2 * details_workers))),
+            thread_name_prefix="places-hedge",
+        )
+
+        # Place details cache shared by all worker processes on this machine
+        cache_path = os.getenv("PLACES_CACHE_PATH")
+        self.details_cache = None
+        if cache_path:
+            self.details_cache = SQLiteCache(cache_path, float(os.getenv("PLACES_CACHE_TTL_SECONDS", "3600")))
+
+        # Travel times from the user's location, cached per origin cell
+        self.travel_times = TravelTimes(
+            self.api_key,
+            self._get,
+            shared_cache=self.details_cache,
+            cell_size_m=float(os.getenv("DISTANCE_CELL_SIZE_M", "200")),
+            ttl_seconds=float(os.getenv("DISTANCE_CACHE_TTL_SECONDS", str(24 * 3600))),
+        )
+        # Details are only fetched until this many places pass the filters
+        self.max_results = int(os.getenv("PLACES_MAX_RESULTS", "10"))
+
+        # Nearest candidates whose travel time is looked up rather than estimated
+        self.distance_top_k = min(MAX_DESTINATIONS, int(os.getenv("DISTANCE_MATRIX_TOP_K", "10")))
+
+    def close(self):
+        """Wait for in-flight upstream calls and release the shared cache."""
+        self._details_pool.shutdown(wait=True)
+        self._travel_pool.shutdown(wait=True)
+        self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+        if self.details_cache:
+            self.details_cache.close()
         
-    def find_restaurants(self, query: str) -> Dict[str, Union[List[Dict], str]]:
+    def find_restaurants(
+        self,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        origin: Optional[str] = None,
+        travel_mode: str = "walking",
+        max_travel_minutes: Optional[float] = None,
+        max_distance_m: Optional[float] = None,
+        strategy: Optional[Dict] = None,
+        max_results: Optional[int] = None,
+    ) -> Dict[str, Union[List[RestaurantRecord], Dict]]:
         """
         Find restaurants based on the given query.
         
         Args:
             query: Search query string (e.g., "Japanese food in Belgrano")
+            deadline: When the results are needed by. Place details that
+                haven't arrived in time are replaced by the text search data.
+            origin: Where the user is, as an address or "lat,lng". When set,
+                every result gets a distance and travel time.
+            travel_mode: Distance Matrix mode: walking, bicycling, transit or driving
+            max_travel_minutes: Drop places further away than this
+            max_distance_m: Drop places further away than this many meters
+            strategy: Filters overriding DEFAULT_STRATEGY (radius, keyword,
+                open_now, open_at, min_rating, max_price); None disables a
+                filter. open_at is an ISO 8601 time, local to each place
+                unless it has a UTC offset, and replaces open_now
+            max_results: Stop fetching details once this many places pass
+                the filters, defaults to PLACES_MAX_RESULTS
             
         Returns:
-            Dictionary containing search results and analysis
+            Dictionary containing RestaurantRecord results, strategy and analysis
         """
+        deadline = deadline or Deadline()
+        strategy = self._build_strategy(origin, travel_mode, max_travel_minutes, max_distance_m, strategy)
+        max_results = max_results or self.max_results
+        degraded = []
         try:
+            # Coordinates bias the text search; addresses are geocoded while it runs
+            origin_point = parse_coordinates(origin) if origin else None
+            origin_future = None
+            if origin and not origin_point:
+                origin_future = self._travel_pool.submit(self._geocode_origin, origin, deadline)
+
             # Search for places
-            places = self._search_places(query)
+            places = self._search_places(query, deadline, strategy, origin_point)
             if not places:
-                return {
-                    "restaurants": [],
-                    "strategy": {
-                        "location": "current location",
-                        "radius": 5000,
-                        "type": "restaurant",
-                        "keyword": None,
-                        "open_now": True,
-                        "min_rating": 4.0,
-                        "max_price": None
-                    },
-                    "analysis": {
-                        "matching_factors": [],
-                        "concerns": ["No restaurants found"],
-                        "score": 0.0
-                    }
-                }
-            
-            # Get details for each place
-            restaurants = []
-            for place in places:
-                details = self._get_place_details(place["place_id"])
-                if details:
-                    restaurants.append(details)
+                return self._empty_result(strategy, "No restaurants found", degraded)
+
+            # Apply the filters to the search results before fetching any details
+            candidates = [RestaurantRecord.from_place_details(place["place_id"], place) for place in places]
+            candidates = self._apply_filters(candidates, strategy)
+            if len(candidates) < len(places):
+                logger.info(f"Filters dropped {len(places) - len(candidates)} of {len(places)} places")
+            if not candidates:
+                return self._empty_result(strategy, "No restaurants match the search filters", degraded)
+
+            if origin_future:
+                try:
+                    origin_point = origin_future.result(timeout=deadline.timeout())
+                except FuturesTimeoutError:
+                    logger.warning(f"Deadline reached while geocoding origin: {origin}")
+                if origin_point is None:
+                    degraded.append("distance")
+
+            # Drop places that are out of reach in a straight line, then look
+            # up real travel times for the nearest ones alongside the details
+            distances = {}
+            travel_future = None
+            looked_up = set()
+            if origin_point:
+                candidates, distances = self._filter_by_distance(candidates, origin_point, strategy["radius"])
+                if not candidates:
+                    return self._empty_result(strategy, "No restaurants within the requested distance", degraded)
+                nearest = sorted(candidates[:max_results], key=lambda c: distances[c.place_id])
+                looked_up = {c.place_id for c in nearest[:self.distance_top_k]}
+                travel_future = self._travel_pool.submit(
+                    self._lookup_travel_times, origin_point, list(looked_up), travel_mode, deadline
+                )
+
+            restaurants, late = self._collect_details(
+                candidates, strategy, max_results, deadline, [travel_future] if travel_future else []
+            )
+            if late:
+                logger.warning(f"Using search data for {late} places without details in time")
+                degraded.append("details")
+
+            if travel_future:
+                routes = travel_future.result() if travel_future.done() else None
+                if routes is None:
+                    logger.warning("No travel times from the Distance Matrix, using estimates")
+                    degraded.append("distance")
+                else:
+                    # The early lookup only covered the first batch; look up
+                    # the nearest results whose details came in later batches
+                    nearest = sorted(restaurants, key=lambda r: distances[r.place_id])[:self.distance_top_k]
+                    missing = [r.place_id for r in nearest if r.place_id not in looked_up]
+                    if missing:
+                        more = self._lookup_travel_times(origin_point, missing, travel_mode, deadline)
+                        if more is None:
+                            logger.warning(f"Using estimates for {len(missing)} places without travel times")
+                            degraded.append("distance")
+                        routes = {**routes, **(more or {})}
+                restaurants = self._apply_travel_times(
+                    restaurants, distances, routes or {},
+                    travel_mode, max_travel_minutes, max_distance_m,
+                )
+            if not restaurants:
+                return self._empty_result(strategy, "No restaurants match the search filters", degraded)
             
             # Analyze the results
             analysis = self._analyze_places(restaurants)
             
             return {
                 "restaurants": restaurants,
-                "strategy": {
-                    "location": "current location",
-                    "radius": 5000,
-                    "type": "restaurant",
-                    "keyword": None,
-                    "open_now": True,
-                    "min_rating": 4.0,
-                    "max_price": None
-                },
+                "strategy": strategy,
                 "analysis": {
                     "matching_factors": analysis.get("matching_factors", []),
                     "concerns": analysis.get("concerns", []),
                     "score": analysis.get("score", 0.0)
-                }
+                },
+                "degraded": degraded
             }
         except Exception as e:
             logger.error(f"Error finding restaurants: {str(e)}")
             raise
+
+    def _build_strategy(
+        self,
+        origin: Optional[str],
+        travel_mode: str,
+        max_travel_minutes: Optional[float],
+        max_distance_m: Optional[float],
+        overrides: Optional[Dict] = None,
+    ) -> Dict:
+        """
+        The filters applied to a search, reported with the results.
+
+        The radius is the tightest of the explicit one and the distance
+        limits, otherwise the default; None (no radius) if the caller
+        disabled it and set no limits.
+        """
+        strategy = dict(DEFAULT_STRATEGY)
+        overrides = {key: value for key, value in (overrides or {}).items() if key in DEFAULT_STRATEGY}
+        strategy.update(overrides)
+        strategy["location"] = origin or DEFAULT_STRATEGY["location"]
+        if strategy.get("open_at"):
+            strategy["open_now"] = None
+
+        limits = []
+        if overrides.get("radius") is not None:
+            limits.append(overrides["radius"])
+        if max_distance_m is not None:
+            limits.append(max_distance_m)
+        if max_travel_minutes is not None:
+            limits.append(max_reachable_distance(max_travel_minutes, travel_mode))
+        if limits:
+            strategy["radius"] = int(min(limits))
+        elif "radius" not in overrides:
+            strategy["radius"] = DEFAULT_STRATEGY["radius"]
+        return strategy
+
+    def _apply_filters(self, places: List[RestaurantRecord], strategy: Dict) -> List[RestaurantRecord]:
+        """
+        The places meeting the rating, price and opening filters.
+
+        Unknown prices and opening hours pass; places without a rating
+        count as 0.0 and fail a minimum rating.
+        """
+        min_rating, max_price = strategy.get("min_rating"), strategy.get("max_price")
+        kept = [
+            place for place in places
+            if (min_rating is None or place.rating >= min_rating)
+            and (max_price is None or place.price_level is None or place.price_level <= max_price)
+        ]
+        return self.filter_open(kept, strategy)
+
+    def filter_open(self, places: List[RestaurantRecord], strategy: Dict) -> List[RestaurantRecord]:
+        """
+        The places open at the time the strategy asks for (open_at, or now).
+
+        Checked for all places at once against their weekly hours, so it's
+        cheap to re-run on earlier results. Places without hours fall back
+        to the API's open_now flag when filtering on the current time.
+        """
+        when = self._opening_time(strategy)
+        if when is None or not places:
+            return list(places)
+        open_at = OpeningHoursIndex(places).open_at(when)
+        if strategy.get("open_at"):
+            return [place for place, is_open in zip(places, open_at) if is_open is not False]
+        return [
+            place for place, is_open in zip(places, open_at)
+            if (place.open_now if is_open is None else is_open) is not False
+        ]
+
+    def _opening_time(self, strategy: Dict) -> Optional[datetime]:
+        """The time places must be open at, or None when opening isn't filtered."""
+        if strategy.get("open_at"):
+            when = strategy["open_at"]
+            if isinstance(when, datetime):
+                return when
+            try:
+                return datetime.fromisoformat(when)
+            except ValueError:
+                logger.warning(f"Ignoring invalid open_at time: {when!r}")
+                return None
+        if strategy.get("open_now"):
+            return datetime.now(timezone.utc)
+        return None
+
+    def _collect_details(
+        self,
+        candidates: List[RestaurantRecord],
+        strategy: Dict,
+        max_results: int,
+        deadline: Deadline,
+        also_wait: List,
+    ) -> Tuple[List[RestaurantRecord], int]:
+        """
+        Fetch details for candidates in order until `max_results` pass the filters.
+
+        Details are fetched in parallel for as many candidates as results
+        are still missing; only if some of them fail the filters (details
+        are fresher than search results) is the next batch fetched. Places
+        whose details miss the deadline or fail keep their search data, and
+        so do all of them if the deadline has already passed.
+
+        Returns:
+            The restaurants and how many of them use search data
+        """
+        if deadline.expired():
+            restaurants = candidates[:max_results]
+            return restaurants, len(restaurants)
+
+        restaurants = []
+        late = 0
+        fetched = 0
+        while len(restaurants) < max_results and fetched < len(candidates) and not deadline.expired():
+            batch = candidates[fetched:fetched + max_results - len(restaurants)]
+            fetched += len(batch)
+            futures = [
+                self._details_pool.submit(self._get_place_details, candidate.place_id, deadline)
+                for candidate in batch
+            ]
+            wait(futures + also_wait, timeout=deadline.timeout())
+            also_wait = []
+            details = []
+            for candidate, future in zip(batch, futures):
+                if future.done():
+                    try:
+                        record = future.result()
+                    except (PlacesAPIError, FuturesTimeoutError) as e:
+                        logger.warning(f"Using search data for {candidate.place_id}: {str(e)}")
+                        late += 1
+                        record = candidate
+                else:
+                    late += 1
+                    record = candidate
+                if record:
+                    details.append(record)
+            restaurants.extend(self._apply_filters(details, strategy))
+        if fetched < len(candidates):
+            logger.info(f"Skipped details for {len(candidates) - fetched} of {len(candidates)} places")
+        return restaurants, late
+
+    def _empty_result(self, strategy: Dict, concern: str, degraded: List[str]) -> Dict:
+        return {
+            "restaurants": [],
+            "strategy": strategy,
+            "analysis": {
+                "matching_factors": [],
+                "concerns": [concern],
+                "score": 0.0
+            },
+            "degraded": degraded
+        }
+
+    def _geocode_origin(self, origin: str, deadline: Deadline) -> Optional[LatLng]:
+        """Coordinates of the user's location, or None if it can't be found in time."""
+        if deadline.expired():
+            logger.warning(f"Deadline reached before geocoding origin: {origin}")
+            return None
+        try:
+            return self.travel_times.geocode(origin, deadline.timeout(self.request_timeout))
+        except Exception as e:
+            logger.error(f"Error geocoding origin {origin}: {str(e)}")
+            return None
+
+    def _filter_by_distance(
+        self,
+        candidates: List[RestaurantRecord],
+        origin: LatLng,
+        radius: Optional[float],
+    ) -> Tuple[List[RestaurantRecord], Dict[str, float]]:
+        """
+        Straight-line distances to all candidates in one pass.
+
+        Places farther than `radius` in a straight line can't be within the
+        limits by route either, so they are dropped before any details or
+        travel times are fetched. Without a radius all are kept.
+
+        Returns:
+            The candidates within the radius and the distance to each, by place_id
+        """
+        distances = straight_line_distances(
+            origin, [c.lat for c in candidates], [c.lng for c in candidates]
+        )
+        kept = [(c, distance) for c, distance in zip(candidates, distances) if radius is None or distance <= radius]
+        if len(kept) < len(candidates):
+            logger.info(f"Dropped {len(candidates) - len(kept)} of {len(candidates)} places out of reach")
+        return [c for c, _ in kept], {c.place_id: distance for c, distance in kept}
+
+    def _lookup_travel_times(
+        self,
+        origin: LatLng,
+        place_ids: List[str],
+        travel_mode: str,
+        deadline: Deadline,
+    ) -> Optional[Dict[str, Tuple[float, float]]]:
+        """Route distances and durations for the given places, or None on failure."""
+        if deadline.expired():
+            logger.warning("Deadline reached before looking up travel times")
+            return None
+        try:
+            return self.travel_times.lookup(
+                origin, place_ids, travel_mode, deadline.timeout(self.request_timeout)
+            )
+        except Exception as e:
+            logger.error(f"Error getting travel times: {str(e)}")
+            return None
+
+    def _apply_travel_times(
+        self,
+        restaurants: List[RestaurantRecord],
+        distances: Dict[str, float],
+        routes: Dict[str, Tuple[float, float]],
+        travel_mode: str,
+        max_travel_minutes: Optional[float],
+        max_distance_m: Optional[float],
+    ) -> List[RestaurantRecord]:
+        """
+        Copies of the records with their distance and travel time, within the limits.
+
+        Looked-up routes are used where available, straight-line estimates
+        otherwise.
+        """
+        kept = []
+        for record in restaurants:
+            straight_line = distances[record.place_id]
+            route = routes.get(record.place_id)
+            if route:
+                distance_m, travel_time_s = route
+            else:
+                distance_m, travel_time_s = straight_line, estimate_travel_time(straight_line, travel_mode)
+            if max_distance_m is not None and distance_m > max_distance_m:
+                continue
+            if max_travel_minutes is not None and travel_time_s > max_travel_minutes * 60:
+                continue
+            kept.append(record.replace(
+                distance_m=distance_m, travel_time_s=travel_time_s, travel_mode=travel_mode
+            ))
+        if len(kept) < len(restaurants):
+            logger.info(f"Dropped {len(restaurants) - len(kept)} of {len(restaurants)} places over the travel limits")
+        return kept
     
-    def _search_places(self, query: str) -> List[Dict]:
-        """Search for places using the Places API."""
+    def _search_places(
+        self,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        strategy: Optional[Dict] = None,
+        location: Optional[LatLng] = None,
+    ) -> List[Dict]:
+        """
+        Search for places using the Places API.
+
+        The filters the Text Search API supports (opening, maximum price and
+        a location with radius) are sent with the request; the keyword is
+        added to the query. Minimum rating has no API parameter and is
+        applied to the results by the caller.
+        """
+        strategy = strategy or DEFAULT_STRATEGY
+        keyword = strategy.get("keyword")
+        if keyword and keyword.lower() not in query.lower():
+            query = f"{query} {keyword}"
         params = {
             "query": query,
-            "type": "restaurant",
+            "type": strategy.get("type") or "restaurant",
             "key": self.api_key
         }
+        if strategy.get("open_now") and not strategy.get("open_at"):
+            params["opennow"] = "true"
+        if strategy.get("max_price") is not None:
+            params["maxprice"] = strategy["max_price"]
+        # The API needs both or neither
+        if location and strategy.get("radius"):
+            params["location"] = f"{location[0]},{location[1]}"
+            params["radius"] = strategy["radius"]
         
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            logger.warning(f"Deadline reached before searching for: {query}")
+            raise ValueError("Ran out of time before searching for restaurants. Please try again.")
+
         try:
-            response = requests.get(self.search_url, params=params)
+            timeout = deadline.timeout(self.request_timeout)
+            response = self._get(self.search_url, params, timeout)
             response.raise_for_status()
             data = response.json()
             
@@ -127,22 +567,63 @@ class RestaurantFinderAgent:
             logger.error(f"Error searching places: {str(e)}")
             raise ValueError("Unexpected error while searching for restaurants. Please try again.")
     
-    def _get_place_details(self, place_id: str) -> Optional[Dict]:
-        """Get detailed information for a specific place."""
+    def _get_place_details(self, place_id: str, deadline: Optional[Deadline] = None) -> Optional[RestaurantRecord]:
+        """
+        Get detailed information for a specific place.
+
+        Concurrent calls for the same place_id wait on a single upstream
+        request and share the resulting (read-only) record, or its error.
+        The deadline only limits how long this caller waits; the shared
+        request runs with the normal request timeout.
+
+        Returns:
+            The place, or None if it doesn't exist or lacks required fields
+
+        Raises:
+            PlacesAPIError: The upstream request failed
+            concurrent.futures.TimeoutError: The deadline passed first
+        """
+        if self.details_cache:
+            cached = self.details_cache.get(f"details:{place_id}")
+            if cached:
+                return RestaurantRecord.from_place_details(place_id, json.loads(cached))
+
+        try:
+            return self._details_flight.do(
+                place_id,
+                self._fetch_place_details,
+                place_id,
+                timeout=(deadline or Deadline()).timeout(self.details_wait_timeout),
+            )
+        except FuturesTimeoutError:
+            logger.error(f"Timed out waiting for in-flight place details: {place_id}")
+            raise
+
+    def _fetch_place_details(self, place_id: str) -> Optional[RestaurantRecord]:
+        """
+        Fetch place details from the Places API.
+
+        Returns None for unknown places and incomplete results; transport
+        errors and other error statuses raise PlacesAPIError, so that every
+        caller waiting on this request sees them.
+        """
         params = {
             "place_id": place_id,
-            "fields": "name,formatted_address,formatted_phone_number,rating,user_ratings_total,price_level,opening_hours,website,url,geometry,vicinity",
+            "fields": "name,formatted_address,formatted_phone_number,rating,user_ratings_total,price_level,opening_hours,utc_offset,website,url,geometry,vicinity",
             "key": self.api_key
         }
         
         try:
-            response = requests.get(self.details_url, params=params)
+            response = self._get(self.details_url, params, self.request_timeout)
             response.raise_for_status()
             data = response.json()
             
+            if data["status"] in ("NOT_FOUND", "INVALID_REQUEST"):
+                logger.warning(f"Place not found: {place_id} ({data['status']})")
+                return None
             if data["status"] != "OK":
                 logger.error(f"Place Details API error: {data['status']}")
-                return None
+                raise PlacesAPIError(f"Place Details API error: {data['status']}")
                 
             result = data.get("result", {})
             
@@ -151,29 +632,68 @@ class RestaurantFinderAgent:
                 logger.error("Missing required fields in place details")
                 return None
             
-            # Add place_id to the result
-            result["place_id"] = place_id
-            
-            # If vicinity is not present, use formatted_address
-            if "vicinity" not in result:
-                result["vicinity"] = result.get("formatted_address", "")
-            
-            # If geometry is not present, create a default one
-            if "geometry" not in result:
-                result["geometry"] = {
-                    "location": {
-                        "lat": 0.0,
-                        "lng": 0.0
-                    }
-                }
-            
-            return result
+            record = RestaurantRecord.from_place_details(place_id, result)
+            if self.details_cache:
+                self.details_cache.set(f"details:{place_id}", json.dumps(record.to_cache_dict()).encode("utf-8"))
+            return record
             
-        except Exception as e:
-            logger.error(f"Error getting place details: {str(e)}")
-            return None
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Network error getting place details: {str(e)}")
+            raise PlacesAPIError(f"Network error getting place details: {str(e)}") from e
+        except (KeyError, ValueError) as e:
+            logger.error(f"Invalid place details response: {str(e)}")
+            raise PlacesAPIError(f"Invalid place details response: {str(e)}") from e
+    
+    def _get(self, url: str, params: Dict, timeout: Optional[float]) -> requests.Response:
+        """
+        GET an idempotent Places endpoint, hedging slow requests.
+
+        If the first request hasn't answered `hedge_delay` seconds after it
+        started a duplicate is sent and whichever succeeds first wins; time
+        spent queued for a pool thread doesn't count, so a saturated pool
+        doesn't duplicate requests that haven't even been sent. The loser is
+        left to finish in the background.
+
+        A timeout that has already run out raises requests' Timeout without
+        sending anything (requests rejects a zero timeout).
+        """
+        if timeout is not None and timeout <= 0:
+            raise requests.exceptions.Timeout("No time left for the request")
+        if not self.hedge_delay:
+            return requests.get(url, params=params, timeout=timeout)
+
+        started = threading.Event()
+        started_at = []
+
+        def attempt():
+            started_at.append(time.monotonic())
+            started.set()
+            return requests.get(url, params=params, timeout=timeout)
+
+        primary = self._hedge_pool.submit(attempt)
+        if not started.wait(timeout):
+            primary.cancel()
+            raise requests.exceptions.Timeout(f"Request still queued after {timeout}s")
+        try:
+            return primary.result(timeout=max(0.0, started_at[0] + self.hedge_delay - time.monotonic()))
+        except FuturesTimeoutError:
+            pass
+
+        with self._hedge_lock:
+            self.hedged_requests += 1
+        backup = self._hedge_pool.submit(requests.get, url, params=params, timeout=timeout)
+        pending = {primary, backup}
+        while pending:
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise requests.exceptions.Timeout(f"Hedged request timed out after {timeout}s")
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        # Both attempts failed; surface the primary's error
+        return primary.result()
     
-    def _analyze_places(self, places: List[Dict]) -> Dict[str, Union[List[str], float]]:
+    def _analyze_places(self, places: List[RestaurantRecord]) -> Dict[str, Union[List[str], float]]:
         """Analyze and rank the restaurant options."""
         if not places:
             return {
@@ -185,10 +705,7 @@ class RestaurantFinderAgent:
         # Create a simple analysis based on ratings and reviews
         sorted_places = sorted(
             places,
-            key=lambda x: (
-                x.get("rating", 0),
-                x.get("user_ratings_total", 0)
-            ),
+            key=lambda x: (x.rating, x.user_ratings_total),
             reverse=True
         )
         
@@ -197,10 +714,10 @@ class RestaurantFinderAgent:
         
         # Analyze each place
         for place in sorted_places:
-            name = place.get("name", "Unknown")
-            rating = place.get("rating", 0)
-            reviews = place.get("user_ratings_total", 0)
-            price_level = place.get("price_level", 1)
+            name = place.name
+            rating = place.rating
+            reviews = place.user_ratings_total
+            price_level = place.price_level if place.price_level is not None else 1
             
             # Add matching factors
             if rating >= 4.0:
@@ -209,6 +726,8 @@ class RestaurantFinderAgent:
                 matching_factors.append(f"Popular place ({reviews} reviews) at {name}")
             if price_level >= 3:
                 matching_factors.append(f"Fancy place (price level {price_level}) at {name}")
+            if place.travel_time_s is not None and place.travel_time_s <= 15 * 60:
+                matching_factors.append(f"Close by ({round(place.travel_time_s / 60)} min {place.travel_mode}) at {name}")
             
             # Add concerns
             if rating < 3.5:
@@ -217,6 +736,8 @@ class RestaurantFinderAgent:
                 concerns.append(f"Few reviews ({reviews}) at {name}")
             if price_level < 2:
                 concerns.append(f"Basic place (price level {price_level}) at {name}")
+            if place.travel_time_s is not None and place.travel_time_s >= 30 * 60:
+                concerns.append(f"Far away ({round(place.travel_time_s / 60)} min {place.travel_mode}) at {name}")
         
         # Calculate overall score
         score = 0.0
@@ -0,0 +1,59 @@
+"""
+Request deadlines.
+Created: 2025-04-20
+Changes:
+- Initial implementation of Deadline
+"""
+
+import time
+from typing import Optional
+
+
+class Deadline:
+    """
+    A point in time by which a request must be answered.
+
+    Created once per request and passed down through each stage, which asks
+    how much time it may spend with `budget` and skips or degrades its work
+    when that is too little.
+    """
+
+    def __init__(self, seconds: Optional[float] = None):
+        """
+        Args:
+            seconds: Time from now until the deadline; None (or infinity)
+                means no deadline
+        """
+        if seconds is None or seconds == float("inf"):
+            self.expires_at = None
+        else:
+            self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left, never negative; infinite when there is no deadline."""
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def budget(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """
+        Seconds a stage may spend while leaving `reserve` seconds for later stages.
+
+        Args:
+            cap: Upper bound for this stage regardless of the deadline
+            reserve: Time later stages need; subtracted from what remains
+        """
+        available = max(0.0, self.remaining() - reserve)
+        return available if cap is None else min(available, cap)
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Timeout for a blocking call: the remaining time, or `default` without a deadline."""
+        if self.expires_at is None:
+            return default
+        return self.remaining() if default is None else min(self.remaining(), default)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
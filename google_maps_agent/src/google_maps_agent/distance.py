@@ -0,0 +1,221 @@
+"""
+Distances and travel times from the user to candidate places.
+Created: 2025-04-23
+Changes:
+- Initial implementation: straight-line distances in one vectorized pass,
+  batched Distance Matrix refinement and a per-origin-cell cache
+- Dropped the optional numpy path, which no install pulled in
+"""
+
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+
+from .cache import SQLiteCache
+
+logger = logging.getLogger(__name__)
+
+LatLng = Tuple[float, float]
+
+EARTH_RADIUS_M = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+# Typical door-to-door city speeds in m/s, per Distance Matrix travel mode
+TRAVEL_SPEEDS = {"walking": 1.3, "bicycling": 4.0, "transit": 5.5, "driving": 8.0}
+
+# Fastest plausible straight-line speeds in m/s (brisk walk, fast cyclist,
+# express train, highway); only used to rule out places nothing could reach
+MAX_TRAVEL_SPEEDS = {"walking": 2.0, "bicycling": 8.0, "transit": 25.0, "driving": 33.0}
+
+# How much longer a real route is than the straight line, on average
+ROUTE_DETOUR_FACTOR = 1.3
+
+# The Distance Matrix API accepts at most 25 destinations per origin
+MAX_DESTINATIONS = 25
+
+_COORDINATES = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
+
+def parse_coordinates(text: str) -> Optional[LatLng]:
+    """Parse "lat,lng" into floats, or None if `text` isn't a coordinate pair."""
+    match = _COORDINATES.match(text or "")
+    if not match:
+        return None
+    lat, lng = float(match.group(1)), float(match.group(2))
+    if not (-90.0 <= lat <= 90.0 and -180.0 <= lng <= 180.0):
+        return None
+    return lat, lng
+
+
+def straight_line_distances(origin: LatLng, lats: Sequence[float], lngs: Sequence[float]) -> List[float]:
+    """Great-circle distance in meters from `origin` to every (lat, lng) pair."""
+    lat1, lng1 = math.radians(origin[0]), math.radians(origin[1])
+    cos_lat1 = math.cos(lat1)
+    distances = []
+    for lat, lng in zip(lats, lngs):
+        lat2, lng2 = math.radians(lat), math.radians(lng)
+        h = math.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_M * math.asin(math.sqrt(min(h, 1.0))))
+    return distances
+
+
+def estimate_travel_time(distance_m: float, mode: str = "walking") -> float:
+    """Rough travel time in seconds for a straight-line distance."""
+    return distance_m * ROUTE_DETOUR_FACTOR / TRAVEL_SPEEDS.get(mode, TRAVEL_SPEEDS["walking"])
+
+
+def max_reachable_distance(minutes: float, mode: str = "walking") -> float:
+    """Farthest straight-line distance in meters coverable in `minutes`; anything beyond is out of reach."""
+    return minutes * 60.0 * MAX_TRAVEL_SPEEDS.get(mode, MAX_TRAVEL_SPEEDS["walking"])
+
+
+def origin_cell(origin: LatLng, cell_size_m: float) -> str:
+    """Grid cell of roughly `cell_size_m` meters containing `origin`."""
+    step = cell_size_m / METERS_PER_DEGREE
+    return f"{math.floor(origin[0] / step)}:{math.floor(origin[1] / step)}"
+
+
+class TravelTimes:
+    """
+    Route distances and durations from an origin to many places.
+
+    All uncached destinations are sent in a single Distance Matrix request.
+    Results are cached per origin grid cell and destination, so users within
+    the same cell (default 200 m) reuse each other's lookups; a shared
+    SQLiteCache makes them available to every worker.
+    """
+
+    distance_matrix_url = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    geocode_url = "https://maps.googleapis.com/maps/api/geocode/json"
+
+    def __init__(
+        self,
+        api_key: str,
+        get: Callable[[str, Dict, Optional[float]], requests.Response],
+        shared_cache: Optional[SQLiteCache] = None,
+        cell_size_m: float = 200.0,
+        ttl_seconds: float = 24 * 3600,
+        max_entries: int = 10000,
+    ):
+        """
+        Args:
+            api_key: Google Maps API key
+            get: Function performing the GET request, `(url, params, timeout)`
+            shared_cache: Cache shared between processes; without it results
+                are only cached in memory
+            cell_size_m: Size of the origin grid cells results are cached by
+            ttl_seconds: Lifetime of a cached travel time or geocode
+            max_entries: In-memory cache size
+        """
+        self.api_key = api_key
+        self._get = get
+        self.shared_cache = shared_cache
+        self.cell_size_m = cell_size_m
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+
+    def _cache_get(self, key: str):
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._memory.move_to_end(key)
+                return entry[1]
+        if self.shared_cache:
+            raw = self.shared_cache.get(key)
+            if raw:
+                value = json.loads(raw)
+                self._remember(key, value)
+                return value
+        return None
+
+    def _remember(self, key: str, value):
+        with self._lock:
+            self._memory[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _cache_set(self, key: str, value):
+        self._remember(key, value)
+        if self.shared_cache:
+            self.shared_cache.set(key, json.dumps(value).encode("utf-8"), self.ttl_seconds)
+
+    def geocode(self, address: str, timeout: Optional[float] = None) -> Optional[LatLng]:
+        """Coordinates of an address or "lat,lng" string, or None if not found."""
+        coordinates = parse_coordinates(address)
+        if coordinates:
+            return coordinates
+
+        key = f"geocode:{address.strip().lower()}"
+        cached = self._cache_get(key)
+        if cached:
+            return cached[0], cached[1]
+
+        self.upstream_calls += 1
+        response = self._get(self.geocode_url, {"address": address, "key": self.api_key}, timeout)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("status") != "OK" or not data.get("results"):
+            logger.warning(f"Could not geocode origin {address!r}: {data.get('status')}")
+            return None
+        location = data["results"][0]["geometry"]["location"]
+        coordinates = (float(location["lat"]), float(location["lng"]))
+        self._cache_set(key, list(coordinates))
+        return coordinates
+
+    def lookup(
+        self,
+        origin: LatLng,
+        place_ids: Sequence[str],
+        mode: str = "walking",
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Route distance (meters) and duration (seconds) to each place.
+
+        Places the API has no route for are left out. Raises on network
+        errors so the caller can fall back to estimates.
+        """
+        cell = origin_cell(origin, self.cell_size_m)
+        results: Dict[str, Tuple[float, float]] = {}
+        missing = []
+        for place_id in place_ids:
+            cached = self._cache_get(f"distance:{mode}:{cell}:{place_id}")
+            if cached:
+                results[place_id] = (cached[0], cached[1])
+            else:
+                missing.append(place_id)
+
+        for start in range(0, len(missing), MAX_DESTINATIONS):
+            batch = missing[start:start + MAX_DESTINATIONS]
+            params = {
+                "origins": f"{origin[0]},{origin[1]}",
+                "destinations": "|".join(f"place_id:{place_id}" for place_id in batch),
+                "mode": mode,
+                "key": self.api_key,
+            }
+            self.upstream_calls += 1
+            response = self._get(self.distance_matrix_url, params, timeout)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("status") != "OK":
+                logger.error(f"Distance Matrix API error: {data.get('status')}")
+                break
+            elements = data["rows"][0]["elements"] if data.get("rows") else []
+            for place_id, element in zip(batch, elements):
+                if element.get("status") != "OK":
+                    continue
+                value = (float(element["distance"]["value"]), float(element["duration"]["value"]))
+                results[place_id] = value
+                self._cache_set(f"distance:{mode}:{cell}:{place_id}", list(value))
+        return results
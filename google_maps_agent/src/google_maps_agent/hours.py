@@ -0,0 +1,119 @@
+"""
+Weekly opening hours index.
+Created: 2025-04-24
+Changes:
+- Initial implementation: opening hours as sorted minute-of-week intervals
+  and an index answering "open at this time?" for many places in one pass
+- Dropped the optional numpy path, which no install pulled in
+"""
+
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from .records import Period, RestaurantRecord
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# [start, end) in minutes since Sunday 00:00, the Places API's first day
+Interval = Tuple[int, int]
+
+# (open at the given time, minutes until that changes); None when hours are unknown
+HoursStatus = Optional[Tuple[bool, int]]
+
+
+def _minute(day: int, hhmm: int) -> int:
+    return day * MINUTES_PER_DAY + (hhmm // 100) * 60 + hhmm % 100
+
+
+def weekly_intervals(periods: Sequence["Period"]) -> Tuple[Interval, ...]:
+    """
+    Convert Places opening periods to sorted, non-overlapping week intervals.
+
+    Periods that run past Saturday midnight are split in two; a period
+    without a close time means the place is always open.
+    """
+    intervals = []
+    for open_day, open_time, close_day, close_time in periods:
+        if close_day < 0:
+            return ((0, MINUTES_PER_WEEK),)
+        start = _minute(open_day, open_time)
+        end = _minute(close_day, close_time)
+        if end <= start:
+            end += MINUTES_PER_WEEK
+        if end > MINUTES_PER_WEEK:
+            intervals.append((start, MINUTES_PER_WEEK))
+            intervals.append((0, end - MINUTES_PER_WEEK))
+        else:
+            intervals.append((start, end))
+
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return tuple(merged)
+
+
+def minute_of_week(when: datetime, utc_offset: Optional[int] = None) -> int:
+    """
+    Minute of the week at a place, Sunday 00:00 being 0.
+
+    Naive datetimes are taken as the place's local time. Aware ones are
+    converted with the place's UTC offset in minutes, or the server's
+    time zone when that is unknown.
+    """
+    if when.tzinfo is not None:
+        zone = timezone(timedelta(minutes=utc_offset)) if utc_offset is not None else None
+        when = when.astimezone(zone)
+    # datetime.weekday() starts on Monday
+    return ((when.weekday() + 1) % 7) * MINUTES_PER_DAY + when.hour * 60 + when.minute
+
+
+def hours_status(intervals: Sequence[Interval], minute: int) -> HoursStatus:
+    """Whether a place with these intervals is open at `minute`, and for how long."""
+    if not intervals:
+        return None
+    i = bisect_right(intervals, (minute, MINUTES_PER_WEEK)) - 1
+    if i >= 0 and intervals[i][0] <= minute < intervals[i][1]:
+        if intervals[i] == (0, MINUTES_PER_WEEK):
+            return True, MINUTES_PER_WEEK
+        until = intervals[i][1] - minute
+        # Open across Saturday midnight
+        if intervals[i][1] == MINUTES_PER_WEEK and intervals[0][0] == 0 and i != 0:
+            until += intervals[0][1]
+        return True, until
+    following = intervals[i + 1][0] if i + 1 < len(intervals) else intervals[0][0] + MINUTES_PER_WEEK
+    return False, following - minute
+
+
+class OpeningHoursIndex:
+    """
+    Opening hours of many places, checked against a time in one pass.
+
+    The intervals are the ones precomputed on each record, so answering
+    for a page of candidates is one binary search per place. Places
+    without known hours report None.
+    """
+
+    def __init__(self, records: Sequence["RestaurantRecord"]):
+        self.size = len(records)
+        self.offsets = [r.utc_offset for r in records]
+        self.intervals = [r.open_intervals for r in records]
+
+    def minutes(self, when: datetime) -> List[int]:
+        """Minute of the week at each place for the given time."""
+        if when.tzinfo is None:
+            return [minute_of_week(when)] * self.size
+        return [minute_of_week(when, offset) for offset in self.offsets]
+
+    def annotate(self, when: datetime) -> List[HoursStatus]:
+        """(open, minutes until that changes) for every place, or None when its hours are unknown."""
+        return [hours_status(intervals, m) for intervals, m in zip(self.intervals, self.minutes(when))]
+
+    def open_at(self, when: datetime) -> List[Optional[bool]]:
+        """Whether each place is open at `when`, or None when its hours are unknown."""
+        return [None if status is None else status[0] for status in self.annotate(when)]
@@ -0,0 +1,200 @@
+"""
+Compact internal restaurant records.
+Created: 2025-04-15
+Changes:
+- Initial implementation of RestaurantRecord with flattened geometry and hours
+- Added per-search travel distance/time fields and replace()
+- Opening hours are also kept as minute-of-week intervals, parsed once and
+  stored with cached places (to_cache_dict)
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+from .hours import Interval, weekly_intervals
+
+# (open_day, open_hhmm, close_day, close_hhmm); close is -1/-1 for places open 24h
+Period = Tuple[int, int, int, int]
+
+
+class RestaurantRecord:
+    """
+    A restaurant as used inside the agent and backend.
+
+    Built once from a Places Details result and shared read-only between
+    callers, so it must not be mutated after construction. Geometry is
+    flattened to `lat`/`lng` floats and opening hours to integer tuples;
+    `to_dict` rebuilds the Google-shaped JSON at the API boundary.
+
+    The travel fields depend on where the user is; they are only set on
+    per-search copies made with `replace` and are never cached.
+    """
+
+    __slots__ = (
+        "place_id",
+        "name",
+        "rating",
+        "user_ratings_total",
+        "vicinity",
+        "formatted_address",
+        "formatted_phone_number",
+        "website",
+        "url",
+        "price_level",
+        "lat",
+        "lng",
+        "open_now",
+        "weekday_text",
+        "periods",
+        "open_intervals",
+        "utc_offset",
+        "distance_m",
+        "travel_time_s",
+        "travel_mode",
+    )
+
+    def __init__(
+        self,
+        place_id: str,
+        name: str,
+        rating: float = 0.0,
+        user_ratings_total: int = 0,
+        vicinity: str = "",
+        formatted_address: Optional[str] = None,
+        formatted_phone_number: Optional[str] = None,
+        website: Optional[str] = None,
+        url: Optional[str] = None,
+        price_level: Optional[int] = None,
+        lat: float = 0.0,
+        lng: float = 0.0,
+        open_now: Optional[bool] = None,
+        weekday_text: Tuple[str, ...] = (),
+        periods: Tuple[Period, ...] = (),
+        open_intervals: Optional[Tuple[Interval, ...]] = None,
+        utc_offset: Optional[int] = None,
+        distance_m: Optional[float] = None,
+        travel_time_s: Optional[float] = None,
+        travel_mode: Optional[str] = None,
+    ):
+        self.place_id = place_id
+        self.name = name
+        self.rating = rating
+        self.user_ratings_total = user_ratings_total
+        self.vicinity = vicinity
+        self.formatted_address = formatted_address
+        self.formatted_phone_number = formatted_phone_number
+        self.website = website
+        self.url = url
+        self.price_level = price_level
+        self.lat = lat
+        self.lng = lng
+        self.open_now = open_now
+        self.weekday_text = weekday_text
+        self.periods = periods
+        # Sorted [start, end) minutes since Sunday 00:00, see hours.weekly_intervals
+        self.open_intervals = weekly_intervals(periods) if open_intervals is None else open_intervals
+        # Minutes from UTC, to evaluate the hours at an absolute time
+        self.utc_offset = utc_offset
+        self.distance_m = distance_m
+        self.travel_time_s = travel_time_s
+        self.travel_mode = travel_mode
+
+    @classmethod
+    def from_place_details(cls, place_id: str, result: Dict[str, Any]) -> "RestaurantRecord":
+        """Build a record from a Places Details `result` object or a `to_cache_dict` payload."""
+        location = result.get("geometry", {}).get("location", {})
+        hours = result.get("opening_hours") or {}
+        periods = []
+        for period in hours.get("periods", []):
+            open_ = period.get("open", {})
+            close = period.get("close")
+            periods.append((
+                int(open_.get("day", 0)),
+                int(open_.get("time", "0000")),
+                int(close["day"]) if close else -1,
+                int(close["time"]) if close else -1,
+            ))
+        open_intervals = None
+        if "open_intervals" in result:
+            open_intervals = tuple((start, end) for start, end in result["open_intervals"])
+        utc_offset = result.get("utc_offset_minutes", result.get("utc_offset"))
+
+        return cls(
+            place_id=place_id,
+            name=result["name"],
+            rating=float(result.get("rating", 0.0)),
+            user_ratings_total=int(result.get("user_ratings_total", 0)),
+            # If vicinity is not present, use formatted_address
+            vicinity=result.get("vicinity") or result.get("formatted_address", ""),
+            formatted_address=result.get("formatted_address"),
+            formatted_phone_number=result.get("formatted_phone_number"),
+            website=result.get("website"),
+            url=result.get("url"),
+            price_level=result.get("price_level"),
+            lat=float(location.get("lat", 0.0)),
+            lng=float(location.get("lng", 0.0)),
+            open_now=hours.get("open_now") if hours else None,
+            weekday_text=tuple(hours.get("weekday_text", ())),
+            periods=tuple(periods),
+            open_intervals=open_intervals,
+            utc_offset=int(utc_offset) if utc_offset is not None else None,
+        )
+
+    def replace(self, **changes: Any) -> "RestaurantRecord":
+        """A copy with some fields changed, leaving the shared record untouched."""
+        values = {slot: getattr(self, slot) for slot in self.__slots__}
+        values.update(changes)
+        return RestaurantRecord(**values)
+
+    @property
+    def opening_hours(self) -> Optional[Dict[str, Any]]:
+        """Opening hours in the Places API JSON shape, or None if unknown."""
+        if self.open_now is None and not self.weekday_text and not self.periods:
+            return None
+        periods = []
+        for open_day, open_time, close_day, close_time in self.periods:
+            period = {"open": {"day": open_day, "time": f"{open_time:04d}"}}
+            if close_day >= 0:
+                period["close"] = {"day": close_day, "time": f"{close_time:04d}"}
+            periods.append(period)
+        hours = {"weekday_text": list(self.weekday_text), "periods": periods}
+        if self.open_now is not None:
+            hours["open_now"] = self.open_now
+        return hours
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to the Google-shaped JSON returned by the API."""
+        data = {
+            "name": self.name,
+            "place_id": self.place_id,
+            "rating": self.rating,
+            "user_ratings_total": self.user_ratings_total,
+            "vicinity": self.vicinity,
+            "formatted_address": self.formatted_address,
+            "formatted_phone_number": self.formatted_phone_number,
+            "website": self.website,
+            "url": self.url,
+            "price_level": self.price_level,
+            "opening_hours": self.opening_hours,
+            "geometry": {"location": {"lat": self.lat, "lng": self.lng}},
+            # Kilometers and minutes, as shown to the user
+            "distance": round(self.distance_m / 1000.0, 2) if self.distance_m is not None else None,
+            "travel_time": round(self.travel_time_s / 60.0) if self.travel_time_s is not None else None,
+            "travel_mode": self.travel_mode,
+        }
+        return {key: value for key, value in data.items() if value is not None}
+
+    def to_cache_dict(self) -> Dict[str, Any]:
+        """`to_dict` plus the parsed hours, so cached places needn't be parsed again."""
+        data = self.to_dict()
+        data["open_intervals"] = [list(interval) for interval in self.open_intervals]
+        if self.utc_offset is not None:
+            data["utc_offset_minutes"] = self.utc_offset
+        return data
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RestaurantRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"RestaurantRecord(place_id={self.place_id!r}, name={self.name!r}, rating={self.rating})"
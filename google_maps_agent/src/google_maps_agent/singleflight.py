@@ -0,0 +1,79 @@
+"""
+Single-flight call coalescing.
+Created: 2025-04-14
+Changes:
+- Initial implementation of SingleFlight for thread-based callers
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls for the same key into a single upstream call.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait on the leader's result instead of
+    issuing their own call. Exceptions raised by the function are re-raised
+    in every waiter. Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self.upstream_calls = 0
+        self.coalesced_calls = 0
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Call `fn(*args, **kwargs)` unless a call for `key` is already in flight.
+
+        Args:
+            key: Identity of the call (e.g. a place_id)
+            fn: Function performing the upstream call
+            timeout: Seconds a waiter is willing to wait for the leader's
+                result; None waits forever. The leader is never interrupted.
+
+        Returns:
+            The result of the (possibly shared) call
+
+        Raises:
+            concurrent.futures.TimeoutError: If a waiter's timeout expires
+            Exception: Whatever `fn` raised
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.upstream_calls += 1
+            else:
+                self.coalesced_calls += 1
+
+        if not leader:
+            logger.debug(f"Joining in-flight call for {key}")
+            return future.result(timeout=timeout)
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return future.result()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters for upstream and coalesced calls."""
+        with self._lock:
+            return {
+                "upstream_calls": self.upstream_calls,
+                "coalesced_calls": self.coalesced_calls,
+                "in_flight": len(self._in_flight),
+            }
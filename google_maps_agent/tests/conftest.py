@@ -0,0 +1,29 @@
+"""Shared fixtures: an agent whose upstream requests are answered by the test."""
+
+import pytest
+
+from google_maps_agent.agent import RestaurantFinderAgent
+
+
+class FakeResponse:
+    """The parts of requests.Response the agent uses."""
+
+    def __init__(self, data, status_code=200):
+        self.data = data
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setenv("GOOGLE_MAPS_API_KEY", "test-key")
+    for name in ("PLACES_CACHE_PATH", "PLACES_HEDGE_DELAY_MS", "PLACES_MAX_RESULTS", "DISTANCE_MATRIX_TOP_K"):
+        monkeypatch.delenv(name, raising=False)
+    agent = RestaurantFinderAgent()
+    yield agent
+    agent.close()
@@ -0,0 +1,81 @@
+"""Tests for the shared SQLite cache."""
+
+import threading
+
+import pytest
+
+from google_maps_agent import cache as cache_module
+from google_maps_agent.cache import SQLiteCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "places.sqlite")
+
+
+def test_values_round_trip_and_are_replaced(path):
+    cache = SQLiteCache(path)
+    assert cache.get("details:p1") is None
+    cache.set("details:p1", b"one")
+    cache.set("details:p1", b"two")
+    assert cache.get("details:p1") == b"two"
+    cache.close()
+
+
+def test_entries_expire_after_their_ttl(path, clock):
+    cache = SQLiteCache(path, ttl_seconds=60)
+    cache.set("a", b"default ttl")
+    cache.set("b", b"own ttl", ttl_seconds=600)
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.get("b") == b"own ttl"
+    assert cache.purge_expired() == 1
+    cache.close()
+
+
+def test_expired_rows_are_purged_every_so_many_writes(path, clock, monkeypatch):
+    monkeypatch.setattr(SQLiteCache, "PURGE_EVERY", 3)
+    cache = SQLiteCache(path, ttl_seconds=60)
+    cache.set("old", b"x")
+    clock.now += 61
+    cache.set("new1", b"x")
+    assert cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 2
+    cache.set("new2", b"x")
+    assert cache._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0] == 2
+    cache.close()
+
+
+def test_processes_and_threads_share_entries(path):
+    writer, reader = SQLiteCache(path), SQLiteCache(path)
+    writer.set("details:p1", b"shared")
+    results = []
+    thread = threading.Thread(target=lambda: results.append(reader.get("details:p1")))
+    thread.start()
+    thread.join(5)
+    assert results == [b"shared"]
+    assert len(reader._connections) == 2
+    writer.close()
+    reader.close()
+
+
+def test_errors_are_logged_not_raised(path):
+    cache = SQLiteCache(path)
+    cache._connection().execute("DROP TABLE cache")
+    cache.set("a", b"x")
+    assert cache.get("a") is None
+    cache.close()
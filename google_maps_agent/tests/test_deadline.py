@@ -0,0 +1,63 @@
+"""Tests for request deadlines."""
+
+import time
+
+import pytest
+import requests
+
+from google_maps_agent.deadline import Deadline
+
+
+def test_no_deadline():
+    deadline = Deadline()
+    assert deadline.remaining() == float("inf")
+    assert not deadline.expired()
+    assert deadline.budget() == float("inf")
+    assert deadline.budget(cap=3) == 3
+    assert deadline.timeout() is None
+    assert deadline.timeout(10) == 10
+    assert Deadline(float("inf")).expires_at is None
+
+
+def test_budget_leaves_the_reserve_for_later_stages():
+    deadline = Deadline(10)
+    assert deadline.budget(reserve=4) == pytest.approx(6, abs=0.05)
+    assert deadline.budget(cap=2, reserve=4) == 2
+    # Never negative, even when the reserve is more than what is left
+    assert deadline.budget(reserve=20) == 0.0
+
+
+def test_timeout_is_the_smaller_of_remaining_and_default():
+    deadline = Deadline(5)
+    assert deadline.timeout() == pytest.approx(5, abs=0.05)
+    assert deadline.timeout(1) == 1
+    assert deadline.timeout(30) == pytest.approx(5, abs=0.05)
+
+
+def test_expired_deadline():
+    deadline = Deadline(0.01)
+    time.sleep(0.02)
+    assert deadline.expired()
+    assert deadline.remaining() == 0.0
+    assert deadline.budget() == 0.0
+    assert deadline.timeout(10) == 0.0
+
+
+def test_search_fails_clearly_once_the_deadline_has_passed(agent):
+    agent._get = lambda url, params, timeout: pytest.fail("request sent after the deadline")
+    with pytest.raises(ValueError, match="Ran out of time"):
+        agent.find_restaurants("sushi", deadline=Deadline(0))
+
+
+def test_travel_lookups_are_skipped_once_the_deadline_has_passed(agent):
+    agent._get = lambda url, params, timeout: pytest.fail("request sent after the deadline")
+    assert agent._geocode_origin("Av. Cabildo 1234", Deadline(0)) is None
+    assert agent._lookup_travel_times((-34.58, -58.42), ["p1"], "walking", Deadline(0)) is None
+
+
+def test_requests_without_time_left_are_not_sent(agent, monkeypatch):
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: pytest.fail("request sent"))
+    for hedge_delay in (0.0, 0.05):
+        agent.hedge_delay = hedge_delay
+        with pytest.raises(requests.exceptions.Timeout):
+            agent._get(agent.search_url, {}, 0.0)
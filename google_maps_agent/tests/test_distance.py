@@ -0,0 +1,128 @@
+"""Tests for distances, travel time lookups and the search radius."""
+
+import pytest
+
+from google_maps_agent.cache import SQLiteCache
+from google_maps_agent.distance import (
+    MAX_DESTINATIONS,
+    TravelTimes,
+    max_reachable_distance,
+    parse_coordinates,
+    straight_line_distances,
+)
+
+from conftest import FakeResponse
+
+PLAZA_SERRANO = (-34.5884, -58.4301)
+
+
+def test_straight_line_distances():
+    distances = straight_line_distances((0.0, 0.0), [0.0, 1.0, 0.0, -34.6037], [0.0, 0.0, 1.0, -58.3816])
+    assert distances[0] == 0.0
+    # One degree along a meridian or the equator
+    assert distances[1] == pytest.approx(111195, rel=1e-3)
+    assert distances[2] == pytest.approx(111195, rel=1e-3)
+    # Plaza Serrano to the Obelisco
+    assert straight_line_distances(PLAZA_SERRANO, [-34.6037], [-58.3816])[0] == pytest.approx(4750, rel=0.02)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("-34.5884,-58.4301", (-34.5884, -58.4301)),
+    (" -34.5 , -58 ", (-34.5, -58.0)),
+    ("Plaza Serrano", None),
+    ("95,10", None),
+])
+def test_parse_coordinates(text, expected):
+    assert parse_coordinates(text) == expected
+
+
+@pytest.mark.parametrize("overrides, max_travel_minutes, max_distance_m, radius", [
+    (None, None, None, 5000),
+    ({"radius": 2000}, None, None, 2000),
+    ({"radius": 2000}, None, 1500, 1500),
+    (None, 10, None, int(max_reachable_distance(10, "walking"))),
+    ({"radius": None}, None, None, None),
+    ({"radius": None}, None, 800, 800),
+])
+def test_radius_is_the_tightest_limit(agent, overrides, max_travel_minutes, max_distance_m, radius):
+    strategy = agent._build_strategy("-34.58,-58.43", "walking", max_travel_minutes, max_distance_m, overrides)
+    assert strategy["radius"] == radius
+
+
+class FakeDistanceMatrix:
+    """Distance Matrix answering 100 m and 60 s per destination index, except NO_ROUTE ids."""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, url, params, timeout):
+        destinations = [d[len("place_id:"):] for d in params["destinations"].split("|")]
+        self.requests.append((params["mode"], destinations))
+        elements = [
+            {"status": "ZERO_RESULTS"} if place_id.startswith("noroute") else
+            {"status": "OK", "distance": {"value": 100 * (i + 1)}, "duration": {"value": 60 * (i + 1)}}
+            for i, place_id in enumerate(destinations)
+        ]
+        return FakeResponse({"status": "OK", "rows": [{"elements": elements}]})
+
+
+def test_lookups_are_batched_by_the_destination_limit():
+    matrix = FakeDistanceMatrix()
+    travel_times = TravelTimes("key", matrix)
+    place_ids = [f"p{i}" for i in range(MAX_DESTINATIONS + 5)]
+    routes = travel_times.lookup(PLAZA_SERRANO, place_ids + ["noroute"])
+    assert [len(destinations) for _, destinations in matrix.requests] == [MAX_DESTINATIONS, 6]
+    assert routes["p0"] == (100.0, 60.0)
+    assert routes[f"p{MAX_DESTINATIONS}"] == (100.0, 60.0)
+    assert "noroute" not in routes
+
+
+def test_lookups_are_cached_per_origin_cell_and_mode(tmp_path):
+    matrix = FakeDistanceMatrix()
+    shared = SQLiteCache(str(tmp_path / "cache.sqlite"))
+    travel_times = TravelTimes("key", matrix, shared_cache=shared, cell_size_m=200)
+    first = travel_times.lookup(PLAZA_SERRANO, ["p1", "p2"])
+    # A few meters away, in the same cell: nothing new to look up
+    nearby = (PLAZA_SERRANO[0] + 0.0001, PLAZA_SERRANO[1])
+    assert travel_times.lookup(nearby, ["p1", "p2"]) == first
+    # Only the new place is requested
+    travel_times.lookup(PLAZA_SERRANO, ["p1", "p3"])
+    travel_times.lookup(PLAZA_SERRANO, ["p1"], mode="driving")
+    assert matrix.requests == [("walking", ["p1", "p2"]), ("walking", ["p3"]), ("driving", ["p1"])]
+    # Other workers reuse the lookups through the shared cache
+    other = TravelTimes("key", FakeDistanceMatrix(), shared_cache=shared, cell_size_m=200)
+    assert other.lookup(PLAZA_SERRANO, ["p1", "p2"]) == first
+    assert other.upstream_calls == 0
+    shared.close()
+
+
+def test_later_batches_get_looked_up_travel_times(agent):
+    # p0 and p1 fail the rating filter once their details arrive, so the
+    # results come from the second batch of details
+    matrix = FakeDistanceMatrix()
+    places = [
+        {"place_id": f"p{i}", "name": f"Place {i}", "rating": 4.5, "user_ratings_total": 100,
+         "geometry": {"location": {"lat": PLAZA_SERRANO[0] + 0.001 * i, "lng": PLAZA_SERRANO[1]}}}
+        for i in range(4)
+    ]
+
+    def get(url, params, timeout):
+        if url == agent.search_url:
+            return FakeResponse({"status": "OK", "results": places})
+        if url == agent.details_url:
+            place = dict(places[int(params["place_id"][1:])], formatted_address="Palermo")
+            if place["place_id"] in ("p0", "p1"):
+                place["rating"] = 3.0
+            return FakeResponse({"status": "OK", "result": place})
+        return matrix(url, params, timeout)
+
+    agent._get = agent.travel_times._get = get
+    agent.max_results = agent.distance_top_k = 2
+    results = agent.find_restaurants(
+        "parrilla", origin="{},{}".format(*PLAZA_SERRANO), strategy={"open_now": None}
+    )
+    assert [r.place_id for r in results["restaurants"]] == ["p2", "p3"]
+    assert sorted(matrix.requests[0][1]) == ["p0", "p1"]
+    assert sorted(matrix.requests[1][1]) == ["p2", "p3"]
+    assert {r.distance_m for r in results["restaurants"]} == {100.0, 200.0}
+    assert results["degraded"] == []
@@ -0,0 +1,111 @@
+"""Tests for the search strategy filters and fetching details only until enough places pass."""
+
+from datetime import datetime
+
+from google_maps_agent.deadline import Deadline
+from google_maps_agent.records import RestaurantRecord
+
+from conftest import FakeResponse
+
+NO_FILTERS = {"open_now": None, "min_rating": None, "max_price": None}
+# Open 12:00 - 23:00 every day
+LUNCH_AND_DINNER = tuple((day, 1200, day, 2300) for day in range(7))
+
+
+def ids(places):
+    return [place.place_id for place in places]
+
+
+def test_rating_and_price_filters(agent):
+    places = [
+        RestaurantRecord("good", "Good", rating=4.5, price_level=2),
+        RestaurantRecord("low", "Low", rating=3.9, price_level=1),
+        RestaurantRecord("unrated", "Unrated"),
+        RestaurantRecord("pricey", "Pricey", rating=4.8, price_level=4),
+        RestaurantRecord("unpriced", "Unpriced", rating=4.2),
+    ]
+    strategy = dict(NO_FILTERS, min_rating=4.0, max_price=2)
+    assert ids(agent._apply_filters(places, strategy)) == ["good", "unpriced"]
+
+
+def test_opening_filters(agent):
+    places = [
+        RestaurantRecord("hours", "Hours", periods=LUNCH_AND_DINNER),
+        RestaurantRecord("flag_open", "Open flag", open_now=True),
+        RestaurantRecord("flag_closed", "Closed flag", open_now=False),
+        RestaurantRecord("unknown", "Unknown"),
+    ]
+    # At 10:00 the place with hours is closed; places without hours are unknown and kept
+    breakfast = dict(NO_FILTERS, open_at="2025-04-23T10:00")
+    assert ids(agent._apply_filters(places, breakfast)) == ["flag_open", "flag_closed", "unknown"]
+    dinner = dict(NO_FILTERS, open_at=datetime(2025, 4, 23, 21, 0))
+    assert ids(agent._apply_filters(places, dinner)) == ["hours", "flag_open", "flag_closed", "unknown"]
+    # Now, places without hours fall back to the API's open_now flag
+    now = dict(NO_FILTERS, open_now=True)
+    assert "flag_closed" not in ids(agent._apply_filters(places, now))
+    assert {"flag_open", "unknown"} <= set(ids(agent._apply_filters(places, now)))
+
+
+def test_filters_are_sent_with_the_text_search(agent):
+    sent = []
+
+    def get(url, params, timeout):
+        sent.append(params)
+        return FakeResponse({"status": "OK", "results": []})
+
+    agent._get = get
+    strategy = agent._build_strategy(None, "walking", None, None, {"max_price": 2, "keyword": "vegan"})
+    agent._search_places("pizza", Deadline(5), strategy, (-34.58, -58.43))
+    no_radius = agent._build_strategy(None, "walking", None, None, {"radius": None, "open_at": "2025-04-23T21:00"})
+    agent._search_places("pizza", Deadline(5), no_radius, (-34.58, -58.43))
+    assert sent[0]["query"] == "pizza vegan"
+    assert (sent[0]["opennow"], sent[0]["maxprice"]) == ("true", 2)
+    assert (sent[0]["location"], sent[0]["radius"]) == ("-34.58,-58.43", 5000)
+    # Without a radius the location isn't sent either, and open_at replaces opennow
+    assert not {"location", "radius", "opennow", "maxprice"} & set(sent[1])
+
+
+def details_server(agent, ratings):
+    """Answer place details with the given ratings, recording which places were fetched."""
+    fetched = []
+
+    def get(url, params, timeout):
+        place_id = params["place_id"]
+        fetched.append(place_id)
+        return FakeResponse({"status": "OK", "result": {
+            "name": place_id, "formatted_address": "Palermo",
+            "rating": ratings[place_id], "user_ratings_total": 10,
+        }})
+
+    agent._get = get
+    return fetched
+
+
+def test_details_stop_once_enough_places_pass(agent):
+    candidates = [RestaurantRecord(f"p{i}", f"p{i}", rating=4.5) for i in range(10)]
+    fetched = details_server(agent, {c.place_id: 4.5 for c in candidates})
+    strategy = dict(NO_FILTERS, min_rating=4.0)
+    restaurants, late = agent._collect_details(candidates, strategy, 3, Deadline(5), [])
+    assert ids(restaurants) == ["p0", "p1", "p2"]
+    assert sorted(fetched) == ["p0", "p1", "p2"]
+    assert late == 0
+
+
+def test_another_batch_is_fetched_for_places_that_fail_on_details(agent):
+    candidates = [RestaurantRecord(f"p{i}", f"p{i}", rating=4.5) for i in range(10)]
+    # Fresher details put p1 and p3 below the minimum rating
+    fetched = details_server(agent, {c.place_id: 3.5 if c.place_id in ("p1", "p3") else 4.5 for c in candidates})
+    strategy = dict(NO_FILTERS, min_rating=4.0)
+    restaurants, late = agent._collect_details(candidates, strategy, 3, Deadline(5), [])
+    assert ids(restaurants) == ["p0", "p2", "p4"]
+    # p0-p2, then p3 for the one missing, then p4
+    assert sorted(fetched) == ["p0", "p1", "p2", "p3", "p4"]
+
+
+def test_no_details_are_fetched_after_the_deadline(agent):
+    candidates = [RestaurantRecord(f"p{i}", f"p{i}", rating=4.5) for i in range(10)]
+    fetched = details_server(agent, {})
+    restaurants, late = agent._collect_details(candidates, NO_FILTERS, 3, Deadline(0), [])
+    assert restaurants == candidates[:3]
+    assert late == 3
+    assert fetched == []
@@ -0,0 +1,124 @@
+"""Tests for the weekly opening hours index."""
+
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from google_maps_agent.hours import (
+    MINUTES_PER_DAY,
+    MINUTES_PER_WEEK,
+    OpeningHoursIndex,
+    hours_status,
+    minute_of_week,
+    weekly_intervals,
+)
+from google_maps_agent.records import RestaurantRecord
+
+SATURDAY = 6 * MINUTES_PER_DAY
+
+
+def brute_force_status(intervals, minute):
+    """hours_status by walking the week minute by minute."""
+    open_minutes = set()
+    for start, end in intervals:
+        open_minutes.update(range(start, end))
+    if not open_minutes:
+        return None
+    is_open = minute in open_minutes
+    if len(open_minutes) == MINUTES_PER_WEEK:
+        return True, MINUTES_PER_WEEK
+    steps = 0
+    while ((minute + steps) % MINUTES_PER_WEEK in open_minutes) == is_open:
+        steps += 1
+    return is_open, steps
+
+
+def random_periods(rng):
+    periods = []
+    for day in range(7):
+        if rng.random() < 0.8:
+            opens = rng.choice([800, 1130, 1900, 2000])
+            closes = rng.choice([1500, 2330, 100, 300])
+            periods.append((day, opens, day if closes > opens else (day + 1) % 7, closes))
+    return tuple(periods)
+
+
+def test_saturday_night_is_split_across_the_week_boundary():
+    # Saturday 20:00 - Sunday 02:00
+    assert weekly_intervals([(6, 2000, 0, 200)]) == ((0, 120), (SATURDAY + 1200, MINUTES_PER_WEEK))
+
+
+def test_overlapping_and_touching_periods_are_merged():
+    periods = [(1, 1200, 1, 1500), (1, 1500, 1, 1800), (1, 1700, 1, 2300)]
+    assert weekly_intervals(periods) == ((MINUTES_PER_DAY + 720, MINUTES_PER_DAY + 1380),)
+
+
+def test_open_around_the_clock():
+    intervals = weekly_intervals([(0, 0, -1, -1)])
+    assert intervals == ((0, MINUTES_PER_WEEK),)
+    assert hours_status(intervals, 1234) == (True, MINUTES_PER_WEEK)
+
+
+def test_status_counts_time_open_past_saturday_midnight():
+    intervals = weekly_intervals([(6, 2000, 0, 200)])
+    # Saturday 23:00: open for 1 hour until midnight plus 2 hours on Sunday
+    assert hours_status(intervals, SATURDAY + 23 * 60) == (True, 180)
+    # Sunday 01:00: one hour left
+    assert hours_status(intervals, 60) == (True, 60)
+    # Sunday 02:00: closed until next Saturday 20:00
+    assert hours_status(intervals, 120) == (False, SATURDAY + 1200 - 120)
+
+
+def test_status_wraps_to_the_first_opening_of_the_week():
+    intervals = weekly_intervals([(0, 1200, 0, 1500)])
+    # Saturday noon: opens Sunday at noon
+    assert hours_status(intervals, SATURDAY + 720) == (False, MINUTES_PER_DAY)
+
+
+def test_unknown_hours():
+    assert hours_status((), 0) is None
+
+
+def test_status_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(50):
+        intervals = weekly_intervals(random_periods(rng))
+        for minute in rng.sample(range(MINUTES_PER_WEEK), 40):
+            assert hours_status(intervals, minute) == brute_force_status(intervals, minute)
+
+
+def test_minute_of_week_uses_the_place_offset_for_aware_times():
+    when = datetime(2025, 4, 27, 1, 30, tzinfo=timezone.utc)  # Sunday
+    # Buenos Aires (UTC-3) is still on Saturday 22:30
+    assert minute_of_week(when, -180) == SATURDAY + 22 * 60 + 30
+    # Naive times are already local to the place
+    assert minute_of_week(datetime(2025, 4, 27, 1, 30)) == 90
+
+
+def test_index_matches_per_place_status():
+    rng = random.Random(11)
+    records = [
+        RestaurantRecord(str(i), "place", periods=random_periods(rng), utc_offset=rng.choice([None, -180, 330]))
+        for i in range(100)
+    ]
+    records.append(RestaurantRecord("unknown", "no hours"))
+    index = OpeningHoursIndex(records)
+    start = datetime(2025, 4, 20, tzinfo=timezone.utc)
+    for _ in range(30):
+        when = start + timedelta(minutes=rng.randrange(MINUTES_PER_WEEK))
+        statuses = index.annotate(when)
+        assert statuses[-1] is None
+        for record, minute, status in zip(records, index.minutes(when), statuses):
+            assert status == brute_force_status(record.open_intervals, minute)
+        assert index.open_at(when) == [None if s is None else s[0] for s in statuses]
+
+
+@pytest.mark.parametrize("hhmm, expected", [(1130, False), (1200, True), (2259, True), (2300, False)])
+def test_cached_records_keep_their_intervals(hhmm, expected):
+    record = RestaurantRecord("p", "place", periods=tuple((d, 1200, d, 2300) for d in range(7)), utc_offset=-180)
+    cached = RestaurantRecord.from_place_details("p", record.to_cache_dict())
+    assert cached.open_intervals == record.open_intervals
+    assert cached.utc_offset == -180
+    when = datetime(2025, 4, 23, hhmm // 100, hhmm % 100)
+    assert OpeningHoursIndex([cached]).open_at(when) == [expected]
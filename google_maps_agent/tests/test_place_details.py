@@ -0,0 +1,97 @@
+"""Tests for place details lookups and how their errors reach callers."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+import pytest
+import requests
+
+from google_maps_agent.agent import PlacesAPIError
+from google_maps_agent.deadline import Deadline
+from google_maps_agent.records import RestaurantRecord
+
+from conftest import FakeResponse
+from test_singleflight import wait_until
+
+DETAILS = {
+    "name": "Parrilla",
+    "formatted_address": "Av. Cabildo 1234",
+    "rating": 4.5,
+    "user_ratings_total": 120,
+}
+
+
+def test_details_are_parsed(agent):
+    agent._get = lambda url, params, timeout: FakeResponse({"status": "OK", "result": DETAILS})
+    record = agent._get_place_details("p1")
+    assert (record.place_id, record.name, record.rating) == ("p1", "Parrilla", 4.5)
+
+
+@pytest.mark.parametrize("data", [
+    {"status": "NOT_FOUND"},
+    {"status": "INVALID_REQUEST"},
+    {"status": "OK", "result": {"name": "No address"}},
+])
+def test_unknown_or_incomplete_places_are_none(agent, data):
+    agent._get = lambda url, params, timeout: FakeResponse(data)
+    assert agent._get_place_details("p1") is None
+
+
+def test_error_statuses_raise(agent):
+    agent._get = lambda url, params, timeout: FakeResponse({"status": "OVER_QUERY_LIMIT"})
+    with pytest.raises(PlacesAPIError, match="OVER_QUERY_LIMIT"):
+        agent._get_place_details("p1")
+
+
+def test_waiters_see_the_leaders_error(agent):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def get(url, params, timeout):
+        calls.append(params["place_id"])
+        started.set()
+        release.wait(5)
+        raise requests.exceptions.ConnectionError("connection reset")
+
+    agent._get = get
+    with ThreadPoolExecutor(3) as pool:
+        leader = pool.submit(agent._get_place_details, "p1")
+        assert started.wait(5)
+        waiters = [pool.submit(agent._get_place_details, "p1") for _ in range(2)]
+        wait_until(lambda: agent._details_flight.stats()["coalesced_calls"] == 2)
+        release.set()
+        for future in [leader] + waiters:
+            with pytest.raises(PlacesAPIError, match="connection reset"):
+                future.result(timeout=5)
+    assert calls == ["p1"]
+
+
+def test_waiting_past_the_deadline_raises(agent):
+    release = threading.Event()
+
+    def get(url, params, timeout):
+        release.wait(5)
+        return FakeResponse({"status": "OK", "result": DETAILS})
+
+    agent._get = get
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(agent._get_place_details, "p1")
+        wait_until(lambda: agent._details_flight.stats()["in_flight"] == 1)
+        with pytest.raises(FuturesTimeoutError):
+            agent._get_place_details("p1", Deadline(0.05))
+        release.set()
+        assert leader.result(timeout=5).name == "Parrilla"
+
+
+def test_failed_details_fall_back_to_search_data(agent):
+    def get(url, params, timeout):
+        if params["place_id"] == "p2":
+            raise requests.exceptions.Timeout("read timed out")
+        return FakeResponse({"status": "OK", "result": dict(DETAILS, name=f"Details {params['place_id']}")})
+
+    agent._get = get
+    candidates = [RestaurantRecord(f"p{i}", f"Search {i}", rating=4.5) for i in range(1, 4)]
+    strategy = {"open_now": None, "min_rating": None}
+    restaurants, late = agent._collect_details(candidates, strategy, 3, Deadline(5), [])
+    assert [r.name for r in restaurants] == ["Details p1", "Search 2", "Details p3"]
+    assert late == 1
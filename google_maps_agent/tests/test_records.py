@@ -0,0 +1,65 @@
+"""Tests for RestaurantRecord conversions."""
+
+from google_maps_agent.records import RestaurantRecord
+
+DETAILS = {
+    "name": "El Preferido",
+    "place_id": "p1",
+    "rating": 4.6,
+    "user_ratings_total": 812,
+    "vicinity": "Jorge Luis Borges 2108",
+    "formatted_address": "Jorge Luis Borges 2108, Palermo, Buenos Aires",
+    "formatted_phone_number": "011 4774-6585",
+    "website": "https://example.com",
+    "url": "https://maps.google.com/?cid=1",
+    "price_level": 3,
+    "opening_hours": {
+        "open_now": True,
+        "weekday_text": ["Monday: 12:00 PM - 11:00 PM"],
+        "periods": [
+            {"open": {"day": 1, "time": "1200"}, "close": {"day": 1, "time": "2300"}},
+            {"open": {"day": 5, "time": "2000"}, "close": {"day": 6, "time": "0200"}},
+        ],
+    },
+    "geometry": {"location": {"lat": -34.5889, "lng": -58.4306}},
+}
+
+
+def test_details_round_trip_to_the_same_json():
+    record = RestaurantRecord.from_place_details("p1", DETAILS)
+    assert record.periods == ((1, 1200, 1, 2300), (5, 2000, 6, 200))
+    assert (record.lat, record.lng) == (-34.5889, -58.4306)
+    assert record.to_dict() == DETAILS
+    assert RestaurantRecord.from_place_details("p1", record.to_dict()) == record
+
+
+def test_missing_fields_are_left_out():
+    record = RestaurantRecord.from_place_details("p2", {"name": "Bar", "formatted_address": "Somewhere 1"})
+    assert record.vicinity == "Somewhere 1"
+    assert record.opening_hours is None
+    assert record.to_dict() == {
+        "name": "Bar",
+        "place_id": "p2",
+        "rating": 0.0,
+        "user_ratings_total": 0,
+        "vicinity": "Somewhere 1",
+        "formatted_address": "Somewhere 1",
+        "geometry": {"location": {"lat": 0.0, "lng": 0.0}},
+    }
+
+
+def test_open_around_the_clock_has_no_close():
+    details = dict(DETAILS, opening_hours={"periods": [{"open": {"day": 0, "time": "0000"}}]})
+    record = RestaurantRecord.from_place_details("p1", details)
+    assert record.periods == ((0, 0, -1, -1),)
+    assert record.to_dict()["opening_hours"]["periods"] == [{"open": {"day": 0, "time": "0000"}}]
+
+
+def test_replace_copies_and_travel_fields_are_shown_in_km_and_minutes():
+    record = RestaurantRecord.from_place_details("p1", DETAILS)
+    nearby = record.replace(distance_m=1234.0, travel_time_s=930.0, travel_mode="walking")
+    assert record.distance_m is None
+    assert "distance" not in record.to_dict()
+    data = nearby.to_dict()
+    assert (data["distance"], data["travel_time"], data["travel_mode"]) == (1.23, 16, "walking")
+    assert nearby.replace(distance_m=None, travel_time_s=None, travel_mode=None) == record
@@ -0,0 +1,90 @@
+"""Tests for single-flight call coalescing."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+import pytest
+
+from google_maps_agent.singleflight import SingleFlight
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll `condition` until it holds, failing the test after `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(5) as pool:
+        leader = pool.submit(flight.do, "key", fetch)
+        assert started.wait(5)
+        waiters = [pool.submit(flight.do, "key", fetch) for _ in range(4)]
+        wait_until(lambda: flight.stats()["coalesced_calls"] == 4)
+        release.set()
+        assert [f.result(timeout=5) for f in [leader] + waiters] == ["result"] * 5
+
+    assert len(calls) == 1
+    assert flight.stats() == {"upstream_calls": 1, "coalesced_calls": 4, "in_flight": 0}
+
+
+def test_exceptions_reach_the_leader_and_every_waiter():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("upstream failed")
+
+    with ThreadPoolExecutor(3) as pool:
+        leader = pool.submit(flight.do, "key", fail)
+        assert started.wait(5)
+        waiters = [pool.submit(flight.do, "key", fail) for _ in range(2)]
+        wait_until(lambda: flight.stats()["coalesced_calls"] == 2)
+        release.set()
+        for future in [leader] + waiters:
+            with pytest.raises(ValueError, match="upstream failed"):
+                future.result(timeout=5)
+
+    # A failed call isn't remembered
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_waiter_timeout_leaves_the_leader_running():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "late"
+
+    with ThreadPoolExecutor(1) as pool:
+        leader = pool.submit(flight.do, "key", slow)
+        assert started.wait(5)
+        with pytest.raises(FuturesTimeoutError):
+            flight.do("key", slow, timeout=0.05)
+        release.set()
+        assert leader.result(timeout=5) == "late"
+
+    assert flight.stats()["upstream_calls"] == 1
+
+
+def test_different_keys_do_not_wait_for_each_other():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == 1
+    assert flight.do("b", lambda: 2) == 2
+    assert flight.stats()["upstream_calls"] == 2